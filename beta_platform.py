@@ -6,284 +6,457 @@ Complete analysis system with all production features
 
 import os
 import sys
+import gzip
 import json
-import threading
-import time
+import hashlib
+import asyncio
+import aiohttp
+import orjson
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
-import requests
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Any, Tuple
+from email.utils import format_datetime
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 import uvicorn
 
 # Configuration
 ODDS_API_KEY = os.environ.get('ODDS_API_KEY', '12ef8ff548ae7e9d3b7f7a6da8a0306d')
 ODDS_API_BASE = "https://api.the-odds-api.com/v4"
 CACHE_UPDATE_INTERVAL = 15  # minutes
+ODDS_API_CONCURRENCY = 2  # simultaneous requests to the Odds API
+EVENTS_POLL_INTERVAL = 10  # seconds between dashboard version checks for SSE clients
+
+# Odds API sport keys for each dashboard sport
+SPORT_KEY_MAPPING = {
+    "nfl": "americanfootball_nfl",
+    "nba": "basketball_nba",
+    "mlb": "baseball_mlb",
+    "ncaaf": "americanfootball_ncaaf"
+}
+VALID_SPORTS = frozenset(SPORT_KEY_MAPPING)
+
+# Pooled HTTP session and background refresh task, created in lifespan
+http_session: Optional[aiohttp.ClientSession] = None
+cache_update_task: Optional[asyncio.Task] = None
+
+# Caps in-flight Odds API calls - concurrent fetches stay under the API's rate limit without sleeping
+api_semaphore = asyncio.Semaphore(ODDS_API_CONCURRENCY)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the cache updater and HTTP session for the app's lifetime."""
+    global http_session, cache_update_task
+    
+    # One pooled session for the server's lifetime: keep-alive connections
+    # and cached DNS are shared by every sport's fetch
+    http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=CACHE_UPDATE_INTERVAL * 60),
+        timeout=aiohttp.ClientTimeout(total=10)
+    )
+    
+    # The updater's first pass is the initial data fetch
+    print("[SERVER] Starting background cache updater...")
+    cache_update_task = asyncio.create_task(cache_loop())
+    
+    yield
+    
+    cache_update_task.cancel()
+    await http_session.close()
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse serialized with orjson (FastAPI's ORJSONResponse is deprecated)."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
 
 # Initialize FastAPI
-app = FastAPI(title="Sports Betting Analysis Platform - High Fidelity Beta")
+app = FastAPI(
+    title="Sports Betting Analysis Platform - High Fidelity Beta",
+    default_response_class=OrjsonResponse,
+    lifespan=lifespan
+)
+
+# Dashboard pages are ~100 KB of HTML - compress anything over 1 KB
+app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 # Global server-side cache
 SERVER_CACHE = {
-    "nfl": {"data": [], "predictions": {}, "last_updated": None},
-    "nba": {"data": [], "predictions": {}, "last_updated": None},
-    "mlb": {"data": [], "predictions": {}, "last_updated": None},
-    "ncaaf": {"data": [], "predictions": {}, "last_updated": None}
+    sport: {"data": [], "predictions": {}, "last_updated": None, "html": None}
+    for sport in SPORT_KEY_MAPPING
 }
 
-def fetch_odds_from_api(sport: str) -> List[Dict]:
-    """Fetch odds from API."""
-    sport_key_mapping = {
-        "nfl": "americanfootball_nfl",
-        "nba": "basketball_nba",
-        "mlb": "baseball_mlb",
-        "ncaaf": "americanfootball_ncaaf"
-    }
+def format_signed(value: Any, spec: str) -> Any:
+    """Format a price or line with an explicit sign, passing placeholders like 'N/A' through."""
+    numeric = (int,) if spec.endswith("d") else (int, float)
+    return spec % value if isinstance(value, numeric) else value
+
+# Dashboard CSS, served with long-lived caching under a content-versioned URL
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers cache every file for a year"""
     
-    sport_key = sport_key_mapping.get(sport, sport)
+    async def get_response(self, path: str, scope) -> Any:
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+app.mount("/static", ImmutableStaticFiles(directory=STATIC_DIR), name="static")
+
+@lru_cache(maxsize=None)
+def static_url(name: str) -> str:
+    """URL for a static file, versioned by its content so a deploy busts caches"""
+    with open(os.path.join(STATIC_DIR, name), "rb") as f:
+        return f"/static/{name}?v={hashlib.blake2b(f.read(), digest_size=6).hexdigest()}"
+
+# Dashboard template, compiled once - auto_reload is off since it only changes on deploy
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+template_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+    cache_size=-1,
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+template_env.filters["signed"] = format_signed
+template_env.globals["static_url"] = static_url
+DASHBOARD_TEMPLATE = template_env.get_template("analysis_dashboard.html")
+
+async def fetch_odds_from_api(sport: str) -> Optional[List[Dict]]:
+    """Fetch odds from API - None when the fetch failed."""
+    sport_key = SPORT_KEY_MAPPING.get(sport, sport)
     
     try:
-        print(f"[API] Fetching {sport} odds...")
-        response = requests.get(
-            f"{ODDS_API_BASE}/sports/{sport_key}/odds",
-            params={
-                'apiKey': ODDS_API_KEY,
-                'regions': 'us',
-                'markets': 'h2h,spreads,totals'  # Only standard markets that work for all sports
-            },
-            timeout=10
-        )
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"[API] ✅ Got {len(data)} {sport} games")
-            print(f"[API] Remaining requests: {response.headers.get('x-requests-remaining', 'N/A')}")
-            return data[:20]  # Limit to 20 games for performance
-        else:
-            print(f"[API] ❌ Error {response.status_code}: {response.text[:200]}")
-            return []
+        async with api_semaphore:
+            print(f"[API] Fetching {sport} odds...")
+            async with http_session.get(
+                f"{ODDS_API_BASE}/sports/{sport_key}/odds",
+                params={
+                    'apiKey': ODDS_API_KEY,
+                    'regions': 'us',
+                    'markets': 'h2h,spreads,totals'  # Only standard markets that work for all sports
+                }
+            ) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    print(f"[API] ✅ Got {len(data)} {sport} games")
+                    print(f"[API] Remaining requests: {response.headers.get('x-requests-remaining', 'N/A')}")
+                    return data[:20]  # Limit to 20 games for performance
+                else:
+                    print(f"[API] ❌ Error {response.status}: {(await response.text())[:200]}")
+                    return None
     except Exception as e:
         print(f"[API] ❌ Error: {e}")
-        return []
+        return None
+
+# Shared generator for all simulated analytics
+RNG = np.random.default_rng()
+
+# Uniform draws as (low, high) per field, in unpacking order
+UNIFORM_BOUNDS = np.array([
+    (-14, 14),     # ml_spread
+    (38, 58),      # ml_total (NFL)
+    (55, 95),      # confidence
+    (0.3, 0.7),    # home win probability
+    (-5, 10), (-5, 10),    # EV spread home/away
+    (-5, 10), (-5, 10),    # EV total over/under
+    (-10, 15), (-10, 15),  # EV moneyline home/away
+    (0, 10), (0, 10),      # injury impact home/away
+    (0, 100),      # precipitation
+    (-3, 3),       # weather impact on total
+    (-10, 10),     # weather impact on passing
+    (38, 58),      # H2H last 5 avg total
+    (20, 35), (17, 30),    # home points for/against
+    (20, 35), (17, 30),    # away points for/against
+    (-14, 14),     # opening spread
+    (30, 70), (30, 70),    # public/money on home
+    (60, 75),      # pace (NFL)
+    (95, 115), (95, 115),  # offensive efficiency home/away
+    (95, 115), (95, 115),  # defensive efficiency home/away
+    (10, 20), (10, 20),    # turnover rate home/away
+    (42, 52),      # official avg total
+    (0.45, 0.55),  # official home win pct
+    (10, 15)       # penalties per game
+], dtype=np.float64)
 
-def generate_comprehensive_analysis(game_data: Dict, sport: str) -> Dict:
-    """Generate comprehensive betting analysis for a game."""
+# (bet type, side) for the EV columns of UNIFORM_BOUNDS, in order
+EV_COLUMNS = slice(4, 10)
+EV_BETS = (
+    ("spread", "home"), ("spread", "away"),
+    ("total", "over"), ("total", "under"),
+    ("moneyline", "home"), ("moneyline", "away")
+)
+
+# Non-NFL sports project basketball-scale totals and pace
+UNIFORM_BOUNDS_OTHER = UNIFORM_BOUNDS.copy()
+UNIFORM_BOUNDS_OTHER[1] = (200, 240)
+UNIFORM_BOUNDS_OTHER[23] = (95, 105)
+
+# Integer draws as [low, high) per field, in unpacking order
+INTEGER_LOW, INTEGER_HIGH = np.array([
+    (0, 3), (0, 3),        # key players out home/away
+    (30, 90), (0, 25),     # temperature, wind speed
+    (0, 10), (0, 10),      # H2H record
+    (0, 10), (0, 10),      # H2H ATS
+    (0, 10), (0, 10),      # H2H totals
+    (0, 6), (0, 6), (0, 6), (0, 6),  # home last 5 / ATS last 5
+    (0, 6), (0, 6), (0, 6), (0, 6),  # away last 5 / ATS last 5
+    (2, 8), (2, 8),        # rest days home/away
+    (0, 3000), (-3, 3)     # travel distance, timezone change
+]).T
+
+# Probability thresholds for boolean flags, in unpacking order
+FLAG_THRESHOLDS = np.array([
+    0.5, 0.5,    # injury details home/away
+    0.5, 0.8,    # movement toward home, steam move
+    0.5, 0.85,   # sharp side home, reverse line movement
+    0.7, 0.9,    # division game, revenge game
+    0.85, 0.8    # look-ahead spot, prime time
+])
+
+def analysis_from_draws(uniforms: List[float], ints: List[int], flags: List[bool],
+                        top_bets: List[Tuple[Tuple[str, str], float]]) -> Dict:
+    """Build one game's analysis from its row of random draws."""
+    (ml_spread, ml_total, confidence, home_win,
+     ev_spread_home, ev_spread_away, ev_over, ev_under, ev_ml_home, ev_ml_away,
+     injury_home, injury_away, precipitation, impact_total, impact_passing,
+     h2h_avg_total, home_pf, home_pa, away_pf, away_pa, opening_spread,
+     public_home, money_home, pace, off_home, off_away, def_home, def_away,
+     to_home, to_away, official_total, official_home_pct, penalties) = uniforms
+    
+    (out_home, out_away, temperature, wind_speed,
+     h2h_a, h2h_b, ats_a, ats_b, ou_a, ou_b,
+     home_l5_w, home_l5_l, home_ats_w, home_ats_l,
+     away_l5_w, away_l5_l, away_ats_w, away_ats_l,
+     rest_home, rest_away, travel, timezone) = ints
+    
+    (details_home, details_away, toward_home, steam_move, sharp_home,
+     reverse_line, division, revenge, look_ahead, prime_time) = flags
     
     analysis = {
         # Basic predictions
-        "ml_spread": np.random.uniform(-14, 14),
-        "ml_total": np.random.uniform(38, 58) if sport == "nfl" else np.random.uniform(200, 240),
-        "confidence": np.random.uniform(55, 95),
+        "ml_spread": ml_spread,
+        "ml_total": ml_total,
+        "confidence": confidence,
         
         # Advanced metrics
         "win_probability": {
-            "home": np.random.uniform(0.3, 0.7),
-            "away": 0
+            "home": home_win,
+            "away": 1 - home_win
         },
         
         # Expected Value calculations
         "ev_calculations": {
             "spread": {
-                "home": np.random.uniform(-5, 10),
-                "away": np.random.uniform(-5, 10)
+                "home": ev_spread_home,
+                "away": ev_spread_away
             },
             "total": {
-                "over": np.random.uniform(-5, 10),
-                "under": np.random.uniform(-5, 10)
+                "over": ev_over,
+                "under": ev_under
             },
             "moneyline": {
-                "home": np.random.uniform(-10, 15),
-                "away": np.random.uniform(-10, 15)
+                "home": ev_ml_home,
+                "away": ev_ml_away
             }
         },
         
         # Injury impact
         "injury_report": {
             "home": {
-                "key_players_out": np.random.randint(0, 3),
-                "impact_score": np.random.uniform(0, 10),
-                "details": ["QB - Questionable (shoulder)", "WR1 - Probable (ankle)"] if np.random.random() > 0.5 else []
+                "key_players_out": out_home,
+                "impact_score": injury_home,
+                "details": ["QB - Questionable (shoulder)", "WR1 - Probable (ankle)"] if details_home else []
             },
             "away": {
-                "key_players_out": np.random.randint(0, 3),
-                "impact_score": np.random.uniform(0, 10),
-                "details": ["RB1 - Out (knee)", "CB1 - Doubtful (hamstring)"] if np.random.random() > 0.5 else []
+                "key_players_out": out_away,
+                "impact_score": injury_away,
+                "details": ["RB1 - Out (knee)", "CB1 - Doubtful (hamstring)"] if details_away else []
             }
         },
         
         # Weather impact (for outdoor games)
         "weather": {
-            "temperature": np.random.randint(30, 90),
-            "wind_speed": np.random.randint(0, 25),
-            "precipitation": np.random.uniform(0, 100),
-            "impact_on_total": np.random.uniform(-3, 3),
-            "impact_on_passing": np.random.uniform(-10, 10)
+            "temperature": temperature,
+            "wind_speed": wind_speed,
+            "precipitation": round(precipitation),  # whole percent, as displayed
+            "impact_on_total": impact_total,
+            "impact_on_passing": impact_passing
         },
         
         # Historical performance
         "historical": {
-            "h2h_record": f"{np.random.randint(0, 10)}-{np.random.randint(0, 10)}",
-            "h2h_ats": f"{np.random.randint(0, 10)}-{np.random.randint(0, 10)}",
-            "h2h_totals": f"{np.random.randint(0, 10)}-{np.random.randint(0, 10)} O/U",
-            "last_5_meetings_avg_total": np.random.uniform(38, 58)
+            "h2h_record": f"{h2h_a}-{h2h_b}",
+            "h2h_ats": f"{ats_a}-{ats_b}",
+            "h2h_totals": f"{ou_a}-{ou_b} O/U",
+            "last_5_meetings_avg_total": h2h_avg_total
         },
         
         # Recent form
         "recent_form": {
             "home": {
-                "last_5": f"{np.random.randint(0, 6)}-{5-np.random.randint(0, 6)}",
-                "ats_last_5": f"{np.random.randint(0, 6)}-{5-np.random.randint(0, 6)}",
-                "avg_points_for": np.random.uniform(20, 35),
-                "avg_points_against": np.random.uniform(17, 30)
+                "last_5": f"{home_l5_w}-{5-home_l5_l}",
+                "ats_last_5": f"{home_ats_w}-{5-home_ats_l}",
+                "avg_points_for": home_pf,
+                "avg_points_against": home_pa
             },
             "away": {
-                "last_5": f"{np.random.randint(0, 6)}-{5-np.random.randint(0, 6)}",
-                "ats_last_5": f"{np.random.randint(0, 6)}-{5-np.random.randint(0, 6)}",
-                "avg_points_for": np.random.uniform(20, 35),
-                "avg_points_against": np.random.uniform(17, 30)
+                "last_5": f"{away_l5_w}-{5-away_l5_l}",
+                "ats_last_5": f"{away_ats_w}-{5-away_ats_l}",
+                "avg_points_for": away_pf,
+                "avg_points_against": away_pa
             }
         },
         
         # Line movement & sharp money
         "market_indicators": {
             "line_movement": {
-                "opening_spread": np.random.uniform(-14, 14),
+                "opening_spread": opening_spread,
                 "current_spread": 0,  # Will be filled from actual data
-                "movement_direction": "toward_home" if np.random.random() > 0.5 else "toward_away",
-                "steam_move": np.random.random() > 0.8
+                "movement_direction": "toward_home" if toward_home else "toward_away",
+                "steam_move": steam_move
             },
             "betting_percentages": {
-                "public_on_home": np.random.uniform(30, 70),
-                "money_on_home": np.random.uniform(30, 70),
-                "sharp_side": "home" if np.random.random() > 0.5 else "away"
+                "public_on_home": public_home,
+                "money_on_home": money_home,
+                "sharp_side": "home" if sharp_home else "away"
             },
-            "reverse_line_movement": np.random.random() > 0.85
+            "reverse_line_movement": reverse_line
         },
         
         # Advanced statistics
         "advanced_stats": {
-            "pace": np.random.uniform(60, 75) if sport == "nfl" else np.random.uniform(95, 105),
+            "pace": pace,
             "offensive_efficiency": {
-                "home": np.random.uniform(95, 115),
-                "away": np.random.uniform(95, 115)
+                "home": off_home,
+                "away": off_away
             },
             "defensive_efficiency": {
-                "home": np.random.uniform(95, 115),
-                "away": np.random.uniform(95, 115)
+                "home": def_home,
+                "away": def_away
             },
             "turnover_rate": {
-                "home": np.random.uniform(10, 20),
-                "away": np.random.uniform(10, 20)
+                "home": to_home,
+                "away": to_away
             }
         },
         
         # Situational factors
         "situational": {
             "rest_days": {
-                "home": np.random.randint(2, 8),
-                "away": np.random.randint(2, 8)
+                "home": rest_home,
+                "away": rest_away
             },
-            "travel_distance": np.random.randint(0, 3000),
-            "timezone_change": np.random.randint(-3, 3),
-            "division_game": np.random.random() > 0.7,
-            "revenge_game": np.random.random() > 0.9,
-            "look_ahead_spot": np.random.random() > 0.85,
-            "prime_time": np.random.random() > 0.8
+            "travel_distance": travel,
+            "timezone_change": timezone,
+            "division_game": division,
+            "revenge_game": revenge,
+            "look_ahead_spot": look_ahead,
+            "prime_time": prime_time
         },
         
         # Referee/Umpire trends
         "official_trends": {
             "name": "John Smith",
-            "avg_total": np.random.uniform(42, 52),
-            "home_win_pct": np.random.uniform(0.45, 0.55),
-            "penalties_per_game": np.random.uniform(10, 15)
+            "avg_total": official_total,
+            "home_win_pct": official_home_pct,
+            "penalties_per_game": penalties
         }
     }
     
-    # Calculate win probability for away team
-    analysis["win_probability"]["away"] = 1 - analysis["win_probability"]["home"]
+    # Best bets arrive preselected: top 3 EVs above 5%, best first
+    analysis["best_bets"] = [
+        {"type": bet_type, "side": side, "ev": ev, "confidence": confidence}
+        for (bet_type, side), ev in top_bets
+    ]
     
-    # Determine best bets based on EV
-    best_bets = []
-    for bet_type, values in analysis["ev_calculations"].items():
-        for side, ev in values.items():
-            if ev > 5:
-                best_bets.append({
-                    "type": bet_type,
-                    "side": side,
-                    "ev": ev,
-                    "confidence": analysis["confidence"]
-                })
+    return analysis
+
+def generate_batch_analysis(games: List[Dict], sport: str) -> Dict[str, Dict]:
+    """Generate comprehensive betting analysis for every game in a sport."""
+    bounds = UNIFORM_BOUNDS if sport == "nfl" else UNIFORM_BOUNDS_OTHER
+    n_games = len(games)
     
-    analysis["best_bets"] = sorted(best_bets, key=lambda x: x["ev"], reverse=True)[:3]
+    # One draw for every uniform field and flag, one for every integer field - whole slate at once
+    draws = RNG.random((n_games, len(bounds) + len(FLAG_THRESHOLDS)))
+    values = bounds[:, 0] + (bounds[:, 1] - bounds[:, 0]) * draws[:, :len(bounds)]
+    flags = (draws[:, len(bounds):] > FLAG_THRESHOLDS).tolist()
+    ints = RNG.integers(INTEGER_LOW, INTEGER_HIGH, size=(n_games, len(INTEGER_LOW))).tolist()
     
-    return analysis
+    # Top 3 EVs per game by partial selection, then ordered best first
+    ev = values[:, EV_COLUMNS]
+    top = np.argpartition(-ev, 3, axis=1)[:, :3]
+    top_ev = np.take_along_axis(ev, top, axis=1)
+    order = np.argsort(-top_ev, axis=1)
+    top = np.take_along_axis(top, order, axis=1).tolist()
+    top_ev = np.take_along_axis(top_ev, order, axis=1).tolist()
+    
+    uniforms = values.tolist()
+    return {
+        game.get("id", ""): analysis_from_draws(
+            uniforms[i], ints[i], flags[i],
+            [(EV_BETS[col], e) for col, e in zip(top[i], top_ev[i]) if e > 5]
+        )
+        for i, game in enumerate(games)
+    }
 
-def update_cache_with_analysis():
+# Serializes refresh passes so two can never interleave their writes to SERVER_CACHE
+refresh_lock = asyncio.Lock()
+
+async def refresh_all():
     """Update cache and generate comprehensive analysis."""
-    global SERVER_CACHE
+    sports = tuple(SPORT_KEY_MAPPING)
     
-    while True:
+    async with refresh_lock:
         print(f"\n[SERVER] Cache update starting at {datetime.now()}")
         
-        for sport in ["nfl", "nba", "mlb", "ncaaf"]:
+        # Fetch every sport concurrently - one round-trip window instead of four
+        results = await asyncio.gather(*(fetch_odds_from_api(sport) for sport in sports))
+        
+        # Entries are built whole and swapped in with one assignment - readers
+        # holding the old entry never see it change underneath them
+        for sport, new_data in zip(sports, results):
+            if new_data is None:
+                # Keep serving the last good slate until a fetch succeeds
+                previous = SERVER_CACHE[sport]
+                if "stale_since" not in previous:
+                    stale_since = datetime.now()
+                    SERVER_CACHE[sport] = {**previous, "stale_since": stale_since,
+                                           "stale_since_iso": stale_since.isoformat()}
+                print(f"[SERVER] ⚠️ Keeping previous {sport} data - fetch failed")
+                continue
+            
             try:
-                # Fetch new odds
-                new_data = fetch_odds_from_api(sport)
-                
-                # Generate comprehensive analysis for each game
-                predictions = {}
-                for game in new_data:
-                    game_id = game.get("id", "")
-                    predictions[game_id] = generate_comprehensive_analysis(game, sport)
-                
-                # Update cache
-                SERVER_CACHE[sport] = {
-                    "data": new_data,
-                    "predictions": predictions,
-                    "last_updated": datetime.now()
-                }
-                
-                time.sleep(2)  # Be nice to API
+                # Analyse the slate and render its dashboard on a worker thread so
+                # requests keep being served while it runs
+                SERVER_CACHE[sport] = await asyncio.to_thread(build_cache_entry, sport, new_data)
                 
             except Exception as e:
                 print(f"[SERVER] Error updating {sport}: {e}")
-        
-        total_games = sum(len(cache["data"]) for cache in SERVER_CACHE.values())
-        print(f"[SERVER] Updated: {total_games} games with comprehensive analysis")
+    
+    total_games = sum(len(cache["data"]) for cache in SERVER_CACHE.values())
+    print(f"[SERVER] Updated: {total_games} games with comprehensive analysis")
+
+async def cache_loop():
+    """Refresh the cache, then sleep until the next update."""
+    while True:
+        await refresh_all()
         
         # Wait before next update
         print(f"[SERVER] Next update in {CACHE_UPDATE_INTERVAL} minutes")
-        time.sleep(CACHE_UPDATE_INTERVAL * 60)
-
-@app.on_event("startup")
-async def startup_event():
-    """Initialize on startup."""
-    print("[SERVER] Starting background cache updater...")
-    cache_thread = threading.Thread(target=update_cache_with_analysis, daemon=True)
-    cache_thread.start()
-    
-    # Initial data fetch
-    print("[SERVER] Initial data fetch...")
-    for sport in ["nfl", "nba", "mlb", "ncaaf"]:
-        data = fetch_odds_from_api(sport)
-        predictions = {}
-        for game in data:
-            predictions[game.get("id", "")] = generate_comprehensive_analysis(game, sport)
-        
-        SERVER_CACHE[sport] = {
-            "data": data,
-            "predictions": predictions,
-            "last_updated": datetime.now()
-        }
-        time.sleep(1)
+        await asyncio.sleep(CACHE_UPDATE_INTERVAL * 60)
 
-@app.get("/")
-async def root():
-    """Home page."""
-    return HTMLResponse("""
+# Static home page, encoded and compressed once at import
+ROOT_HTML = """
     <html>
     <head>
         <title>Sports Betting Analysis Platform - High Fidelity Beta</title>
@@ -404,461 +577,206 @@ async def root():
         </div>
     </body>
     </html>
-    """)
+    """.encode()
+ROOT_HTML_GZ = gzip.compress(ROOT_HTML, compresslevel=9)
+GZIP_HEADERS = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
 
-@app.get("/dashboard/{sport}")
-async def comprehensive_dashboard(sport: str):
-    """Comprehensive betting dashboard with all analytics."""
-    cache = SERVER_CACHE.get(sport, {})
-    games = cache.get("data", [])
-    predictions = cache.get("predictions", {})
-    
-    if not games:
-        return HTMLResponse(f"<h1>Loading {sport.upper()} data...</h1>")
-    
-    # Group games by date
-    from datetime import datetime
-    from collections import defaultdict
-    games_by_date = defaultdict(list)
+# Placeholder pages for sports whose first refresh hasn't landed yet
+LOADING_PAGES = {
+    sport: f"<h1>Loading {sport.upper()} data...</h1>".encode()
+    for sport in VALID_SPORTS
+}
+
+@app.get("/")
+async def root(request: Request):
+    """Home page."""
+    # A fresh response around the prebuilt bytes - middleware edits the headers
+    # of the response it is handed, so a shared one would carry them into later requests
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return HTMLResponse(ROOT_HTML_GZ, headers=GZIP_HEADERS)
+    return HTMLResponse(ROOT_HTML)
+
+class BookRow(NamedTuple):
+    """One sportsbook's lines for a game, as shown in the odds table."""
+    name: str
+    spread: Any = "N/A"
+    spread_odds: Any = ""
+    total: Any = "N/A"
+    total_odds: Any = ""
+    home_ml: Any = "N/A"
+    away_ml: Any = "N/A"
+
+def pack_book_odds(games: List[Dict]) -> Dict[str, List[BookRow]]:
+    """Flatten each game's top 3 books into odds-table rows."""
+    book_rows = {}
+    for game in games:
+        rows = []
+        for book in game.get("bookmakers", [])[:3]:  # Show top 3 books
+            lines = {}
+            for market in book.get("markets", []):
+                if market["key"] == "spreads" and market.get("outcomes"):
+                    lines["spread"] = market["outcomes"][0].get("point", "N/A")
+                    lines["spread_odds"] = market["outcomes"][0].get("price", -110)
+                elif market["key"] == "totals" and market.get("outcomes"):
+                    lines["total"] = market["outcomes"][0].get("point", "N/A")
+                    lines["total_odds"] = market["outcomes"][0].get("price", -110)
+                elif market["key"] == "h2h" and market.get("outcomes"):
+                    for outcome in market["outcomes"]:
+                        if outcome["name"] == game["home_team"]:
+                            lines["home_ml"] = outcome.get("price", "N/A")
+                        elif outcome["name"] == game["away_team"]:
+                            lines["away_ml"] = outcome.get("price", "N/A")
+            rows.append(BookRow(book["title"], **lines))
+        book_rows[game.get("id", "")] = rows
+    return book_rows
+
+@lru_cache(maxsize=2048)
+def parse_commence_time(commence_time: str) -> datetime:
+    """Parse an Odds API commence_time - the same strings come back every refresh."""
+    return datetime.fromisoformat(commence_time.replace('Z', '+00:00'))
+
+def group_games_by_date(games: List[Dict]) -> List[Tuple[str, List[str]]]:
+    """Group game ids under their display date, in chronological order."""
+    games_by_day = defaultdict(list)
+    undated = []
     
     for game in games:
         try:
             game_time = game.get('commence_time', '')
             if game_time:
-                dt = datetime.fromisoformat(game_time.replace('Z', '+00:00'))
-                date_key = dt.strftime("%A, %B %d")
-                games_by_date[date_key].append(game)
+                dt = parse_commence_time(game_time)
+                games_by_day[(dt.date(), dt.strftime("%A, %B %d"))].append(game.get("id", ""))
         except:
-            games_by_date["Date TBD"].append(game)
+            undated.append(game.get("id", ""))
     
-    sorted_dates = sorted(games_by_date.keys())
+    # Sort on the calendar date, not the label - "Friday, ..." must not precede "Thursday, ..."
+    dates_sorted = [(label, game_ids) for (_, label), game_ids in sorted(games_by_day.items())]
+    if undated:
+        dates_sorted.append(("Date TBD", undated))
+    return dates_sorted
+
+def build_cache_entry(sport: str, games: List[Dict]) -> Dict:
+    """Analyse a slate and precompute everything its dashboard shows."""
+    entry = {
+        "data": games,
+        "predictions": generate_batch_analysis(games, sport),
+        "book_rows": pack_book_odds(games),
+        "dates_sorted": group_games_by_date(games),
+        "last_updated": datetime.now()
+    }
+    entry["last_updated_iso"] = entry["last_updated"].isoformat()
     
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>{sport.upper()} Complete Analysis Dashboard</title>
-        <style>
-            body {{
-                font-family: -apple-system, sans-serif;
-                background: #0a0a0a;
-                color: #fff;
-                margin: 0;
-                padding: 20px;
-            }}
-            .header {{
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                padding: 30px;
-                border-radius: 15px;
-                margin-bottom: 30px;
-            }}
-            .date-section {{
-                margin: 30px 0;
-            }}
-            .date-header {{
-                font-size: 24px;
-                color: #00ff87;
-                margin-bottom: 20px;
-                padding-bottom: 10px;
-                border-bottom: 2px solid #00ff87;
-            }}
-            .game-analysis {{
-                background: #1a1a1a;
-                border-radius: 15px;
-                padding: 25px;
-                margin: 20px 0;
-                border: 1px solid #333;
-            }}
-            .game-header {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 20px;
-                padding-bottom: 15px;
-                border-bottom: 1px solid #444;
-            }}
-            .teams {{
-                font-size: 22px;
-                font-weight: bold;
-            }}
-            .game-time {{
-                color: #888;
-                font-size: 14px;
-            }}
-            .analysis-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-                gap: 20px;
-                margin: 20px 0;
-            }}
-            .analysis-card {{
-                background: #252525;
-                padding: 15px;
-                border-radius: 10px;
-                border-left: 3px solid #00ff87;
-            }}
-            .card-title {{
-                color: #00ff87;
-                font-weight: bold;
-                margin-bottom: 10px;
-                font-size: 14px;
-                text-transform: uppercase;
-            }}
-            .best-bet {{
-                background: linear-gradient(135deg, #00ff87, #00cc6a);
-                color: black;
-                padding: 15px;
-                border-radius: 10px;
-                margin: 10px 0;
-                font-weight: bold;
-            }}
-            .metric {{
-                display: flex;
-                justify-content: space-between;
-                padding: 5px 0;
-                border-bottom: 1px solid #333;
-            }}
-            .metric-label {{
-                color: #888;
-                font-size: 13px;
-            }}
-            .metric-value {{
-                font-weight: bold;
-                font-size: 13px;
-            }}
-            .positive {{ color: #00ff87; }}
-            .negative {{ color: #ff4757; }}
-            .neutral {{ color: #ffd93d; }}
-            .odds-table {{
-                width: 100%;
-                border-collapse: collapse;
-                margin: 10px 0;
-            }}
-            .odds-table th {{
-                background: #1e3c72;
-                padding: 10px;
-                text-align: left;
-                font-size: 12px;
-            }}
-            .odds-table td {{
-                padding: 8px;
-                border-bottom: 1px solid #333;
-                font-size: 13px;
-            }}
-            .injury-alert {{
-                background: rgba(255, 71, 87, 0.2);
-                border-left: 3px solid #ff4757;
-                padding: 10px;
-                margin: 10px 0;
-                border-radius: 5px;
-            }}
-            .weather-impact {{
-                background: rgba(255, 217, 61, 0.2);
-                border-left: 3px solid #ffd93d;
-                padding: 10px;
-                margin: 10px 0;
-                border-radius: 5px;
-            }}
-            .sharp-money {{
-                background: rgba(0, 255, 135, 0.2);
-                border-left: 3px solid #00ff87;
-                padding: 10px;
-                margin: 10px 0;
-                border-radius: 5px;
-            }}
-            .confidence-bar {{
-                height: 20px;
-                background: #333;
-                border-radius: 10px;
-                overflow: hidden;
-                margin: 10px 0;
-            }}
-            .confidence-fill {{
-                height: 100%;
-                background: linear-gradient(90deg, #ff4757, #ffd93d, #00ff87);
-                transition: width 0.3s;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>🎯 {sport.upper()} Complete Betting Analysis</h1>
-            <p>Last Updated: {cache.get('last_updated').strftime('%I:%M %p ET') if cache.get('last_updated') else 'Loading...'}</p>
-            <p>{len(games)} Games | Real-Time Odds | AI Predictions | Sharp Money Tracking</p>
-        </div>
-    """
+    # Rendered and encoded once here for every request until the next refresh,
+    # with its conditional-GET validators
+    html = render_dashboard_html(sport, entry)
+    entry["html"] = html.encode() if html else None
+    entry["headers"] = {
+        "ETag": f'W/"{sport}-{int(entry["last_updated"].timestamp())}"',
+        "Last-Modified": format_datetime(entry["last_updated"].astimezone(timezone.utc), usegmt=True),
+        "Cache-Control": "public, max-age=60"
+    }
+    # A 304 bypasses compression, so it carries the page's Vary itself; full
+    # responses leave Vary to whatever compresses them
+    entry["not_modified_headers"] = {**entry["headers"], "Vary": "Accept-Encoding"}
     
-    # Show games for each date
-    for date in sorted_dates[:3]:  # Show first 3 days
-        date_games = games_by_date[date]
-        
-        html += f"""
-        <div class="date-section">
-            <div class="date-header">📅 {date} - {len(date_games)} Games</div>
-        """
-        
-        for game in date_games[:5]:  # Max 5 games per day
-            game_id = game.get("id", "")
-            analysis = predictions.get(game_id, {})
-            
-            # Get current odds from bookmakers
-            current_odds = {}
-            if game.get("bookmakers"):
-                for book in game["bookmakers"][:3]:  # Show top 3 books
-                    book_odds = {"name": book["title"]}
-                    for market in book.get("markets", []):
-                        if market["key"] == "spreads" and market.get("outcomes"):
-                            book_odds["spread"] = market["outcomes"][0].get("point", "N/A")
-                            book_odds["spread_odds"] = market["outcomes"][0].get("price", -110)
-                        elif market["key"] == "totals" and market.get("outcomes"):
-                            book_odds["total"] = market["outcomes"][0].get("point", "N/A")
-                            book_odds["total_odds"] = market["outcomes"][0].get("price", -110)
-                        elif market["key"] == "h2h" and market.get("outcomes"):
-                            for outcome in market["outcomes"]:
-                                if outcome["name"] == game["home_team"]:
-                                    book_odds["home_ml"] = outcome.get("price", "N/A")
-                                elif outcome["name"] == game["away_team"]:
-                                    book_odds["away_ml"] = outcome.get("price", "N/A")
-                    current_odds[book["title"]] = book_odds
-            
-            html += f"""
-            <div class="game-analysis">
-                <div class="game-header">
-                    <div>
-                        <div class="teams">{game['away_team']} @ {game['home_team']}</div>
-                        <div class="game-time">🕐 {game.get('commence_time', 'TBD')[:16].replace('T', ' ')}</div>
-                    </div>
-                    <div style="text-align: right;">
-                        <div class="confidence-bar" style="width: 200px;">
-                            <div class="confidence-fill" style="width: {analysis.get('confidence', 50)}%"></div>
-                        </div>
-                        <div style="font-size: 12px; color: #888;">Confidence: {analysis.get('confidence', 0):.1f}%</div>
-                    </div>
-                </div>
-                
-                <!-- Current Odds from Books -->
-                <div class="analysis-card">
-                    <div class="card-title">📊 Live Odds Comparison</div>
-                    <table class="odds-table">
-                        <tr>
-                            <th>Sportsbook</th>
-                            <th>Spread</th>
-                            <th>Total</th>
-                            <th>ML Home</th>
-                            <th>ML Away</th>
-                        </tr>
-            """
-            
-            for book_name, odds in current_odds.items():
-                html += f"""
-                        <tr>
-                            <td>{book_name}</td>
-                            <td>{odds.get('spread', 'N/A'):+.1f if isinstance(odds.get('spread'), (int, float)) else odds.get('spread')} ({odds.get('spread_odds', '')})</td>
-                            <td>O/U {odds.get('total', 'N/A')}</td>
-                            <td>{odds.get('home_ml', 'N/A'):+d if isinstance(odds.get('home_ml'), int) else odds.get('home_ml')}</td>
-                            <td>{odds.get('away_ml', 'N/A'):+d if isinstance(odds.get('away_ml'), int) else odds.get('away_ml')}</td>
-                        </tr>
-                """
-            
-            html += """
-                    </table>
-                </div>
-                
-                <div class="analysis-grid">
-                    <!-- AI Predictions -->
-                    <div class="analysis-card">
-                        <div class="card-title">🤖 AI Model Predictions</div>
-            """
-            
-            html += f"""
-                        <div class="metric">
-                            <span class="metric-label">Projected Spread:</span>
-                            <span class="metric-value">{analysis.get('ml_spread', 0):+.1f}</span>
-                        </div>
-                        <div class="metric">
-                            <span class="metric-label">Projected Total:</span>
-                            <span class="metric-value">{analysis.get('ml_total', 0):.1f}</span>
-                        </div>
-                        <div class="metric">
-                            <span class="metric-label">Win Probability:</span>
-                            <span class="metric-value">{game['home_team']}: {analysis.get('win_probability', {}).get('home', 0.5)*100:.1f}%</span>
-                        </div>
-                    </div>
-                    
-                    <!-- Expected Value -->
-                    <div class="analysis-card">
-                        <div class="card-title">💰 Expected Value Analysis</div>
-            """
-            
-            ev_data = analysis.get('ev_calculations', {})
-            for bet_type, sides in ev_data.items():
-                for side, ev in sides.items():
-                    color_class = "positive" if ev > 0 else "negative" if ev < 0 else "neutral"
-                    html += f"""
-                        <div class="metric">
-                            <span class="metric-label">{bet_type.title()} {side.title()}:</span>
-                            <span class="metric-value {color_class}">{ev:+.2f}%</span>
-                        </div>
-                    """
-            
-            html += """
-                    </div>
-                    
-                    <!-- Injury Report -->
-                    <div class="analysis-card">
-                        <div class="card-title">🏥 Injury Impact</div>
-            """
-            
-            injury_data = analysis.get('injury_report', {})
-            for team_type in ['home', 'away']:
-                team_name = game[f'{team_type}_team']
-                team_injuries = injury_data.get(team_type, {})
-                if team_injuries.get('details'):
-                    html += f"""
-                        <div class="injury-alert">
-                            <strong>{team_name}:</strong><br>
-                            {', '.join(team_injuries['details'])}<br>
-                            Impact Score: {team_injuries.get('impact_score', 0):.1f}/10
-                        </div>
-                    """
-            
-            html += """
-                    </div>
-                    
-                    <!-- Line Movement & Sharp Money -->
-                    <div class="analysis-card">
-                        <div class="card-title">📈 Market Indicators</div>
-            """
-            
-            market = analysis.get('market_indicators', {})
-            line_move = market.get('line_movement', {})
-            betting_pct = market.get('betting_percentages', {})
-            
-            html += f"""
-                        <div class="metric">
-                            <span class="metric-label">Opening Line:</span>
-                            <span class="metric-value">{line_move.get('opening_spread', 0):+.1f}</span>
-                        </div>
-                        <div class="metric">
-                            <span class="metric-label">Line Direction:</span>
-                            <span class="metric-value">{line_move.get('movement_direction', 'stable').replace('_', ' ').title()}</span>
-                        </div>
-                        <div class="metric">
-                            <span class="metric-label">Public on Home:</span>
-                            <span class="metric-value">{betting_pct.get('public_on_home', 50):.0f}%</span>
-                        </div>
-                        <div class="metric">
-                            <span class="metric-label">Money on Home:</span>
-                            <span class="metric-value">{betting_pct.get('money_on_home', 50):.0f}%</span>
-                        </div>
-            """
-            
-            if market.get('reverse_line_movement'):
-                html += """
-                        <div class="sharp-money">
-                            ⚡ REVERSE LINE MOVEMENT DETECTED - Sharp money likely on """ + betting_pct.get('sharp_side', 'unknown') + """
-                        </div>
-                """
-            
-            html += """
-                    </div>
-                    
-                    <!-- Weather Impact -->
-                    <div class="analysis-card">
-                        <div class="card-title">🌡️ Weather Conditions</div>
-            """
-            
-            weather = analysis.get('weather', {})
-            html += f"""
-                        <div class="metric">
-                            <span class="metric-label">Temperature:</span>
-                            <span class="metric-value">{weather.get('temperature', 72)}°F</span>
-                        </div>
-                        <div class="metric">
-                            <span class="metric-label">Wind Speed:</span>
-                            <span class="metric-value">{weather.get('wind_speed', 0)} mph</span>
-                        </div>
-                        <div class="metric">
-                            <span class="metric-label">Precipitation:</span>
-                            <span class="metric-value">{weather.get('precipitation', 0):.0f}%</span>
-                        </div>
-                        <div class="metric">
-                            <span class="metric-label">Total Impact:</span>
-                            <span class="metric-value {('negative' if weather.get('impact_on_total', 0) < 0 else 'positive')}">
-                                {weather.get('impact_on_total', 0):+.1f} pts
-                            </span>
-                        </div>
-                    </div>
-                    
-                    <!-- Historical Performance -->
-                    <div class="analysis-card">
-                        <div class="card-title">📜 Historical Matchups</div>
-            """
-            
-            historical = analysis.get('historical', {})
-            html += f"""
-                        <div class="metric">
-                            <span class="metric-label">H2H Record:</span>
-                            <span class="metric-value">{historical.get('h2h_record', 'N/A')}</span>
-                        </div>
-                        <div class="metric">
-                            <span class="metric-label">ATS Record:</span>
-                            <span class="metric-value">{historical.get('h2h_ats', 'N/A')}</span>
-                        </div>
-                        <div class="metric">
-                            <span class="metric-label">O/U Record:</span>
-                            <span class="metric-value">{historical.get('h2h_totals', 'N/A')}</span>
-                        </div>
-                        <div class="metric">
-                            <span class="metric-label">Avg Total (L5):</span>
-                            <span class="metric-value">{historical.get('last_5_meetings_avg_total', 0):.1f}</span>
-                        </div>
-                    </div>
-                </div>
-            """
-            
-            # Best Bets Section
-            best_bets = analysis.get('best_bets', [])
-            if best_bets:
-                html += """
-                <div style="margin-top: 20px;">
-                    <div class="card-title">🎯 RECOMMENDED BETS</div>
-                """
-                for bet in best_bets[:2]:
-                    html += f"""
-                    <div class="best-bet">
-                        ✅ {bet['type'].upper()} - {bet['side'].upper()}<br>
-                        Expected Value: +{bet['ev']:.2f}% | Confidence: {bet['confidence']:.1f}%
-                    </div>
-                    """
-                html += "</div>"
-            
-            html += "</div>"  # Close game-analysis
-        
-        html += "</div>"  # Close date-section
+    # Compressed once per refresh too - GZipMiddleware passes it through as-is
+    entry["html_gz"] = gzip.compress(entry["html"], compresslevel=6) if html else None
+    entry["gzip_headers"] = {**entry["headers"], "Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+    return entry
+
+def render_dashboard_html(sport: str, cache: Dict) -> Optional[str]:
+    """Render a sport's complete analysis dashboard from its cache entry."""
+    games = cache.get("data", [])
     
-    html += """
-    <script>
-        // Auto refresh every 3 minutes
-        setTimeout(() => location.reload(), 3 * 60 * 1000);
-    </script>
-    </body>
-    </html>
-    """
+    if not games:
+        return None
+    
+    games_by_id = {game.get("id", ""): game for game in games}
+    predictions = cache["predictions"]
+    book_rows = cache["book_rows"]
+    
+    # Each game with its analysis and odds-table rows, for the first 3 days
+    days = [
+        (date, len(game_ids), [
+            (games_by_id[game_id], predictions[game_id], book_rows[game_id])
+            for game_id in game_ids[:5]  # Max 5 games per day
+        ])
+        for date, game_ids in cache["dates_sorted"][:3]
+    ]
+    
+    return DASHBOARD_TEMPLATE.render(
+        sport=sport,
+        days=days,
+        game_count=len(games),
+        last_updated=cache.get("last_updated")
+    )
+
+@app.get("/dashboard/{sport}")
+async def comprehensive_dashboard(sport: str, request: Request):
+    """Comprehensive betting dashboard with all analytics."""
+    if sport not in VALID_SPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown sport: {sport}")
+    
+    # Rendered once per cache refresh - requests only look it up
+    cache = SERVER_CACHE[sport]
+    html = cache["html"]
+    
+    if not html:
+        return HTMLResponse(LOADING_PAGES[sport])
     
-    return HTMLResponse(html)
+    # Browser already has this refresh's page - headers only
+    if request.headers.get("if-none-match") == cache["headers"]["ETag"]:
+        return Response(status_code=304, headers=cache["not_modified_headers"])
+    
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return HTMLResponse(cache["html_gz"], headers=cache["gzip_headers"])
+    
+    return HTMLResponse(html, headers=cache["headers"])
+
+@app.get("/events/{sport}")
+async def dashboard_events(sport: str):
+    """Server-sent events carrying the version of a sport's latest refresh."""
+    if sport not in VALID_SPORTS:
+        raise HTTPException(status_code=404, detail=f"Unknown sport: {sport}")
+    
+    async def versions():
+        # Open dashboards reload only when this changes, not on a timer; the
+        # retry line goes out first so the stream opens before any refresh lands
+        yield f"retry: {EVENTS_POLL_INTERVAL * 1000}\n\n"
+        sent = None
+        while True:
+            version = SERVER_CACHE[sport].get("last_updated_iso")
+            if version and version != sent:
+                sent = version
+                yield f"data: {version}\n\n"
+            await asyncio.sleep(EVENTS_POLL_INTERVAL)
+    
+    return StreamingResponse(versions(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+def status_etag() -> str:
+    """Weak validator for /api/status - moves whenever a sport refreshes or goes stale."""
+    stamps = (cache.get(key) for cache in SERVER_CACHE.values() for key in ("last_updated", "stale_since"))
+    return 'W/"status-' + "-".join(str(int(stamp.timestamp())) if stamp else "0" for stamp in stamps) + '"'
 
 @app.get("/api/status")
-async def api_status():
+async def api_status(request: Request):
     """API status endpoint."""
-    status = {}
-    for sport, cache in SERVER_CACHE.items():
-        status[sport] = {
-            "games": len(cache.get("data", [])),
-            "predictions": len(cache.get("predictions", {})),
-            "last_updated": cache.get("last_updated").isoformat() if cache.get("last_updated") else None
+    etag = status_etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    # Timestamps are formatted once when the entry is written, not per poll;
+    # returning the response directly skips FastAPI's jsonable_encoder pass
+    return OrjsonResponse({
+        sport: {
+            "games": len(cache["data"]),
+            "predictions": len(cache["predictions"]),
+            "last_updated": cache.get("last_updated_iso"),
+            "stale_since": cache.get("stale_since_iso")
         }
-    return JSONResponse(content=status)
+        for sport, cache in SERVER_CACHE.items()
+    }, headers={"ETag": etag})
 
 if __name__ == "__main__":
     print("=" * 60)
@@ -870,5 +788,24 @@ if __name__ == "__main__":
     print("📊 Complete betting analytics")
     print("=" * 60)
     
+    # C event loop and HTTP parser when installed
+    try:
+        import uvloop, httptools
+        server_loop, server_http = "uvloop", "httptools"
+    except ImportError:
+        print("⚠️ uvloop/httptools not available - using asyncio + h11")
+        server_loop, server_http = "asyncio", "h11"
+    
+    # Each worker runs its own cache updater (one API pass per worker per
+    # refresh), so extra workers are opt-in
+    workers = int(os.environ.get('WEB_CONCURRENCY', 1))
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    uvicorn.run(
+        "beta_platform:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=port,
+        loop=server_loop,
+        http=server_http,
+        workers=workers,
+        access_log=False
+    )
\ No newline at end of file
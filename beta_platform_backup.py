@@ -5,22 +5,33 @@ Shows actual bets, not just confidence scores
 """
 
 import os
+import re
 import sys
 import json
+import uuid
 import hashlib
+import hmac
 import secrets
 import asyncio
-import requests
+import sqlite3
+import aiohttp
+import orjson
 import numpy as np
+from collections import defaultdict
+from cachetools import LRUCache, TTLCache
 from datetime import datetime, timedelta
+from functools import lru_cache
+from string import Template
 from typing import Dict, List, Optional, Any, Tuple
 from fastapi import FastAPI, Request, Form, HTTPException, Depends, BackgroundTasks
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+from fastapi.staticfiles import StaticFiles
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup, escape
 from pydantic import BaseModel
 import uvicorn
-import threading
-import time
 
 # Add project root to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -38,21 +49,97 @@ except ImportError as e:
     print(f"⚠️ ML Models not available: {e}")
     print("Will use simplified analysis")
 
+# Try to import Numba for the odds-scoring kernel
+_NUMBA_AVAILABLE = False
+try:
+    from numba import njit
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    print("⚠️ Numba not available - odds scoring runs in pure Python")
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        return lambda func: func
+
+# Try to import BLAKE3 (SIMD) for per-request payload digests
+_BLAKE3_AVAILABLE = False
+try:
+    from blake3 import blake3
+    _BLAKE3_AVAILABLE = True
+except ImportError:
+    print("⚠️ blake3 not available - payload digests use hashlib.blake2b")
+
+# Try to import argon2 for password hashing
+_ARGON2_AVAILABLE = False
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    _ARGON2_AVAILABLE = True
+except ImportError:
+    print("⚠️ argon2-cffi not available - passwords use hashlib.scrypt")
+
 # Configuration
 SECRET_KEY = os.environ.get('SECRET_KEY', secrets.token_hex(32))
+# Mark the session cookie Secure when served over HTTPS (off for local http)
+COOKIE_SECURE = os.environ.get('COOKIE_SECURE', 'false').lower() == 'true'
 GOOGLE_ANALYTICS_ID = "G-FPHYK266CT"
 ODDS_API_KEY = os.environ.get('ODDS_API_KEY', '12ef8ff548ae7e9d3b7f7a6da8a0306d')
 ODDS_API_BASE = "https://api.the-odds-api.com/v4"
+VALID_CODES = frozenset(("BETA2024", "EARLY2024", "VIP2024", "ML2024"))  # beta access codes
+
+class OrjsonResponse(JSONResponse):
+    """Default JSON response, encoded with orjson"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
 
 # Initialize FastAPI
-app = FastAPI(title="Sports Betting Beta - ML Enhanced")
+app = FastAPI(title="Sports Betting Beta - ML Enhanced", default_response_class=OrjsonResponse)
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
+
+# Storage - users, sessions and bets persist in SQLite (WAL: readers don't
+# block the writer and commits skip the full-file fsync)
+STATE_DB_PATH = os.environ.get('STATE_DB_PATH', 'state.db')
+SESSION_TTL = 86400  # seconds
+db = sqlite3.connect(STATE_DB_PATH, check_same_thread=False, isolation_level=None)
+db.executescript("""
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    CREATE TABLE IF NOT EXISTS users (
+        username TEXT PRIMARY KEY,
+        email TEXT NOT NULL,
+        password_hash TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        access_code TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS sessions (
+        id TEXT PRIMARY KEY,
+        username TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at);
+    CREATE TABLE IF NOT EXISTS bets (
+        id INTEGER PRIMARY KEY,
+        ref TEXT NOT NULL,
+        username TEXT NOT NULL,
+        game_id TEXT,
+        pick TEXT,
+        placed_at TEXT NOT NULL,
+        status TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS bets_username ON bets (username);
+""")
 
-# Storage
-users_db = {}
-sessions = {}
-user_bets = {}
-user_performance = {}
-bet_history = []
+# Per-user stats stay in memory (bounded so a long-running process doesn't grow forever)
+user_performance = LRUCache(maxsize=100_000)
+
+# Placed bets waiting for the background flush to write them in one batch.
+# SQLite assigns the row id, so workers sharing the database never collide;
+# clients get a UUID ref instead
+pending_bets: List[Tuple] = []
+BET_INSERT = "INSERT INTO bets (ref, username, game_id, pick, placed_at, status) VALUES (?, ?, ?, ?, ?, ?)"
+BET_FLUSH_INTERVAL = 0.1  # seconds
+bet_flush_task: Optional[asyncio.Task] = None
 
 # Server-side cache (shared by ALL users)
 SERVER_ODDS_CACHE = {
@@ -66,6 +153,39 @@ SERVER_ODDS_CACHE = {
 CACHE_UPDATE_INTERVAL = 30  # minutes
 LAST_API_CALL = None
 
+# Cache key -> Odds API sport key
+SPORT_API_KEYS = {
+    "nfl": "americanfootball_nfl",
+    "nba": "basketball_nba",
+    "mlb": "baseball_mlb",
+    "ncaaf": "americanfootball_ncaaf"
+}
+
+# Shared HTTP session and background updater (created on startup)
+http_session: Optional[aiohttp.ClientSession] = None
+cache_update_task: Optional[asyncio.Task] = None
+
+# In-flight fetches per sport so concurrent callers share one API call
+_inflight_fetches: Dict[str, asyncio.Future] = {}
+
+# Rendered dashboard pages shared by all users (as split_user_slots chunks), keyed
+# by (sport, odds payload digest, ML_MODELS_AVAILABLE), living as long as the odds
+html_cache = TTLCache(maxsize=32, ttl=CACHE_UPDATE_INTERVAL * 60)
+
+# Latest page per sport for the next minute, so repeat views skip even the
+# payload digest; a lock per odds feed keeps concurrent misses for the same
+# sport from rendering twice without making other sports wait on its fetch
+dashboard_pages = TTLCache(maxsize=16, ttl=60)
+_render_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+# Per-user slots in the cached dashboard HTML, filled in on every request
+USER_PLACEHOLDER = "{USER}"
+USER_ROI_PLACEHOLDER = "{USER_ROI}"
+USER_RECORD_PLACEHOLDER = "{USER_RECORD}"
+_USER_SLOT_RE = re.compile("(%s)" % "|".join(
+    map(re.escape, (USER_PLACEHOLDER, USER_ROI_PLACEHOLDER, USER_RECORD_PLACEHOLDER))
+))
+
 # Initialize ML models if available
 if ML_MODELS_AVAILABLE:
     try:
@@ -80,8 +200,9 @@ else:
     nfl_model = None
     mlb_model = None
 
+@lru_cache(maxsize=4096)
 def format_game_time(iso_time: str) -> str:
-    """Format ISO time to readable format"""
+    """Format ISO time to readable format (kickoff times repeat across renders)"""
     try:
         if iso_time:
             dt = datetime.fromisoformat(iso_time.replace('Z', '+00:00'))
@@ -91,12 +212,116 @@ def format_game_time(iso_time: str) -> str:
     except:
         return "Time TBD"
 
+# Confidence tiers - a score at or above each threshold moves up one tier
+CONFIDENCE_THRESHOLDS = np.array([50, 60, 70, 80])
+CONFIDENCE_LEVELS = ("AVOID", "FAIR", "GOOD", "HIGH", "ELITE")
+CONFIDENCE_COLORS = ("#F44336", "#FF9800", "#FFC107", "#66BB6A", "#4CAF50")
+
+def confidence_tiers(scores) -> np.ndarray:
+    """Tier index into CONFIDENCE_LEVELS/CONFIDENCE_COLORS for each score"""
+    return np.searchsorted(CONFIDENCE_THRESHOLDS, scores, side="right")
+
+# Columns of the flattened odds batch: one row per (game, bookmaker, market)
+ODDS_COLUMN_TYPES = {
+    "game_idx": np.int64,
+    "game_id": str,
+    "home_team": str,
+    "away_team": str,
+    "book_idx": np.int64,
+    "book_title": str,
+    "market": str,
+    "home_price": np.float64,  # h2h only
+    "away_price": np.float64,  # h2h only
+    "price": np.float64,       # spreads/totals: first outcome's price
+    "point": np.float64        # spreads/totals: first outcome's point
+}
+
+def outcomes_by_name(market: Dict) -> Dict[str, Dict]:
+    """Index a market's outcomes by name for O(1) team lookups"""
+    return {o["name"]: o for o in market["outcomes"]}
+
+def parse_odds_to_columns(games: List[Dict]) -> Dict[str, np.ndarray]:
+    """Walk the nested odds payload once into NumPy columns"""
+    rows = []
+    
+    for game_idx, game in enumerate(games):
+        home_team = game.get("home_team", "")
+        away_team = game.get("away_team", "")
+        for book_idx, bookmaker in enumerate(game.get("bookmakers", [])):
+            for market in bookmaker.get("markets", []):
+                if market["key"] == "h2h":
+                    by_name = outcomes_by_name(market)
+                    home_price = by_name.get(home_team, {}).get("price", np.nan)
+                    away_price = by_name.get(away_team, {}).get("price", np.nan)
+                    price = point = np.nan
+                else:
+                    home_price = away_price = np.nan
+                    price = market["outcomes"][0].get("price", 1.91)
+                    point = market["outcomes"][0].get("point", 0)
+                
+                rows.append((game_idx, game.get("id", ""), home_team, away_team, book_idx,
+                             bookmaker.get("title", ""), market["key"], home_price, away_price, price, point))
+    
+    # Transpose the row tuples into columns in one pass
+    columns = list(zip(*rows)) or [()] * len(ODDS_COLUMN_TYPES)
+    return {name: np.array(column, dtype=dtype)
+            for (name, dtype), column in zip(ODDS_COLUMN_TYPES.items(), columns)}
+
+def odds_rows(columns: Dict[str, np.ndarray], game_idx: int) -> Dict[str, np.ndarray]:
+    """Zero-copy slice of one game's rows out of a parsed odds batch"""
+    start, stop = np.searchsorted(columns["game_idx"], (game_idx, game_idx + 1))
+    return {name: column[start:stop] for name, column in columns.items()}
+
+def _last_row(mask: np.ndarray) -> Optional[int]:
+    """Index of the last row selected by mask (later markets override earlier ones)"""
+    matches = np.flatnonzero(mask)
+    return int(matches[-1]) if len(matches) else None
+
+DEFAULT_ODDS = {"spread": 0, "spread_odds": 1.91, "total": 0, "total_odds": 1.91,
+                "home_ml": 2.0, "away_ml": 2.0}
+
+def first_book_odds(rows: Dict[str, np.ndarray]) -> Dict:
+    """Current spread, total and moneyline odds from a game's first bookmaker"""
+    odds = dict(DEFAULT_ODDS)
+    first_book = rows["book_idx"] == 0
+    market = rows["market"]
+    
+    i = _last_row(first_book & (market == "spreads"))
+    if i is not None:
+        odds["spread"], odds["spread_odds"] = float(rows["point"][i]), float(rows["price"][i])
+    i = _last_row(first_book & (market == "totals"))
+    if i is not None:
+        odds["total"], odds["total_odds"] = float(rows["point"][i]), float(rows["price"][i])
+    i = _last_row(first_book & (market == "h2h"))
+    if i is not None:
+        if not np.isnan(rows["home_price"][i]):
+            odds["home_ml"] = float(rows["home_price"][i])
+        if not np.isnan(rows["away_price"][i]):
+            odds["away_ml"] = float(rows["away_price"][i])
+    return odds
+
 class BettingRecommendation:
     """Generate clear betting recommendations"""
     
     @staticmethod
-    def generate_recommendation(game_data: Dict, analysis: Dict) -> Dict:
-        """Create a clear betting recommendation"""
+    def add_expected_values(bets: List[Dict]) -> None:
+        """Set expected_value on every non-arbitrage bet in one vectorized pass"""
+        priced = [bet for bet in bets if bet["type"] != "ARBITRAGE"]
+        if not priced:
+            return
+        odds = np.fromiter((bet["odds"] for bet in priced), dtype=np.float64, count=len(priced))
+        win_prob = np.fromiter((bet["confidence"] for bet in priced), dtype=np.float64, count=len(priced)) / 100
+        ev = (win_prob * (odds - 1)) - (1 - win_prob)
+        for bet, value in zip(priced, (ev * 100).tolist()):
+            bet["expected_value"] = f"{value:.1f}%"
+    
+    @staticmethod
+    def generate_recommendation(game_data: Dict, analysis: Dict,
+                                expected_values: bool = True) -> Dict:
+        """Create a clear betting recommendation from a game's analysis
+        
+        Pass expected_values=False when batching add_expected_values over many games.
+        """
         
         recommendation = {
             "game_id": game_data.get("id"),
@@ -104,21 +329,11 @@ class BettingRecommendation:
             "bets": []
         }
         
-        # Extract current odds
-        if game_data.get("bookmakers"):
-            bookmaker = game_data["bookmakers"][0]  # Use first bookmaker
-            for market in bookmaker.get("markets", []):
-                if market["key"] == "spreads":
-                    spread = market["outcomes"][0].get("point", 0)
-                    spread_odds = market["outcomes"][0].get("price", 1.91)
-                elif market["key"] == "totals":
-                    total = market["outcomes"][0].get("point", 0)
-                    total_odds = market["outcomes"][0].get("price", 1.91)
-                elif market["key"] == "h2h":
-                    home_ml = next((o["price"] for o in market["outcomes"] 
-                                   if o["name"] == game_data["home_team"]), 2.0)
-                    away_ml = next((o["price"] for o in market["outcomes"] 
-                                   if o["name"] == game_data["away_team"]), 2.0)
+        # Current odds were extracted by analyze_game_with_ml
+        odds = analysis.get("odds", DEFAULT_ODDS)
+        spread, spread_odds = odds["spread"], odds["spread_odds"]
+        total, total_odds = odds["total"], odds["total_odds"]
+        home_ml, away_ml = odds["home_ml"], odds["away_ml"]
         
         confidence = analysis.get("confidence_score", 50)
         confidence_level = analysis.get("confidence_level", "WEAK")
@@ -207,50 +422,141 @@ class BettingRecommendation:
             })
         
         # Add expected value calculation
-        for bet in recommendation["bets"]:
-            if bet["type"] != "ARBITRAGE":
-                implied_prob = 1 / bet["odds"]
-                win_prob = bet["confidence"] / 100
-                ev = (win_prob * (bet["odds"] - 1)) - (1 - win_prob)
-                bet["expected_value"] = f"{ev*100:.1f}%"
+        if expected_values:
+            BettingRecommendation.add_expected_values(recommendation["bets"])
         
         return recommendation
 
-def get_ml_prediction(game_data: Dict, sport: str) -> Dict:
-    """Get prediction from ML models if available"""
+@njit(cache=True)
+def _score_odds(odds):
+    """Score an [n_games, n_books, 2] array of (home, away) decimal odds
     
-    if not ML_MODELS_AVAILABLE or not game_data:
-        return {}
+    A NaN price (a book not quoting that side, or padding beyond a game's
+    real book count) is left out of that side's average and best price.
+    Returns per-game odds confidence, home-favorite mask, edge and arbitrage
+    profit margin (NaN when there is no arbitrage to check).
+    """
+    n_games = odds.shape[0]
+    confidence = np.empty(n_games)
+    home_favorite = np.empty(n_games, dtype=np.bool_)
+    edge = np.empty(n_games)
+    arb_margin = np.full(n_games, np.nan)
+    
+    for g in range(n_games):
+        n_home = 0
+        n_away = 0
+        sum_home = 0.0
+        sum_away = 0.0
+        best_home = 0.0
+        best_away = 0.0
+        for b in range(odds.shape[1]):
+            home_odds = odds[g, b, 0]
+            away_odds = odds[g, b, 1]
+            if not np.isnan(home_odds):
+                n_home += 1
+                sum_home += home_odds
+                best_home = max(best_home, home_odds)
+            if not np.isnan(away_odds):
+                n_away += 1
+                sum_away += away_odds
+                best_away = max(best_away, away_odds)
+        
+        avg_home = sum_home / n_home if n_home else 0.0
+        avg_away = sum_away / n_away if n_away else 0.0
+        home_prob = 1 / avg_home if avg_home > 0 else 0.5
+        away_prob = 1 / avg_away if avg_away > 0 else 0.5
+        
+        home_favorite[g] = home_prob > away_prob
+        favorite_prob = home_prob if home_favorite[g] else away_prob
+        confidence[g] = min(85.0, 50 + (favorite_prob - 0.5) * 70)
+        edge[g] = abs(home_prob - away_prob) * 100
+        
+        if max(n_home, n_away) >= 2 and best_home > 0 and best_away > 0:
+            arb_margin[g] = (1 - (1 / best_home + 1 / best_away)) * 100
+    
+    return confidence, home_favorite, edge, arb_margin
+
+# Warm the kernel at import so the first request doesn't pay for compilation
+_score_odds(np.full((1, 2, 2), 2.0))
+
+# Team name -> integer id for ML feature encoding (grows as new teams appear)
+TEAM_IDS: Dict[str, int] = {}
+TEAM_NAMES: List[str] = []
+
+# Column order of the NFL feature matrix
+NFL_FEATURES = ("home_team", "away_team", "spread", "total")
+
+def team_id(name: str) -> int:
+    """Stable integer id for a team name"""
+    if name not in TEAM_IDS:
+        TEAM_IDS[name] = len(TEAM_NAMES)
+        TEAM_NAMES.append(name)
+    return TEAM_IDS[name]
+
+def nfl_predict_batch(X: np.ndarray) -> List[Dict]:
+    """Run the NFL model over a feature matrix with one row per game"""
+    if hasattr(nfl_model, "predict_batch"):
+        return nfl_model.predict_batch(X)
+    
+    # Model has no batch API yet - predict row by row with the dict features it expects
+    return [
+        nfl_model.predict({
+            "home_team": TEAM_NAMES[int(home)],
+            "away_team": TEAM_NAMES[int(away)],
+            "spread": spread,
+            "total": total
+        })
+        for home, away, spread, total in X
+    ]
+
+def get_ml_predictions(games: List[Dict], sport: str) -> List[Dict]:
+    """Get predictions for a batch of games from ML models if available"""
+    
+    if not ML_MODELS_AVAILABLE or not games:
+        return [{} for _ in games]
     
     try:
         if sport == "NFL" and nfl_model:
             # Prepare features for NFL model
-            features = {
-                "home_team": game_data.get("home_team"),
-                "away_team": game_data.get("away_team"),
-                "spread": 0,  # Would get from odds
-                "total": 0,   # Would get from odds
-            }
-            prediction = nfl_model.predict(features)
-            return {
-                "ml_confidence": prediction.get("confidence", 50),
-                "ml_prediction": prediction.get("winner"),
-                "ml_spread": prediction.get("spread_prediction"),
-                "ml_total": prediction.get("total_prediction")
-            }
+            X = np.zeros((len(games), len(NFL_FEATURES)))  # spread/total would come from odds
+            for i, game in enumerate(games):
+                X[i, 0] = team_id(game.get("home_team"))
+                X[i, 1] = team_id(game.get("away_team"))
+            
+            return [
+                {
+                    "ml_confidence": prediction.get("confidence", 50),
+                    "ml_prediction": prediction.get("winner"),
+                    "ml_spread": prediction.get("spread_prediction"),
+                    "ml_total": prediction.get("total_prediction")
+                }
+                for prediction in nfl_predict_batch(X)
+            ]
         elif sport in ["MLB", "NBA"] and mlb_model:
             # Use MLB model for now
-            return {
-                "ml_confidence": 65,
-                "ml_prediction": "home" if np.random.random() > 0.45 else "away"
-            }
+            home_picks = np.random.random(len(games)) > 0.45
+            return [
+                {"ml_confidence": 65, "ml_prediction": "home" if home_pick else "away"}
+                for home_pick in home_picks
+            ]
     except Exception as e:
         print(f"ML prediction error: {e}")
     
-    return {}
+    return [{} for _ in games]
+
+def get_ml_prediction(game_data: Dict, sport: str) -> Dict:
+    """Get prediction for a single game from ML models if available"""
+    if not game_data:
+        return {}
+    return get_ml_predictions([game_data], sport)[0]
 
-def analyze_game_with_ml(game_data: Dict, sport: str = "NFL") -> Dict:
-    """Enhanced game analysis with ML predictions"""
+def analyze_game_with_ml(game_data: Dict, sport: str = "NFL",
+                         rows: Optional[Dict[str, np.ndarray]] = None,
+                         ml_prediction: Optional[Dict] = None) -> Dict:
+    """Enhanced game analysis with ML predictions from a game's parsed odds rows"""
+    
+    if rows is None:
+        rows = odds_rows(parse_odds_to_columns([game_data]), 0)
     
     analysis = {
         "game_id": game_data.get("id", "unknown"),
@@ -260,43 +566,29 @@ def analyze_game_with_ml(game_data: Dict, sport: str = "NFL") -> Dict:
         "sport": sport
     }
     
-    # Get ML prediction if available
-    ml_prediction = get_ml_prediction(game_data, sport)
-    
-    # Extract odds
-    bookmaker_odds = []
-    spread = 0
-    total = 0
-    
-    for bookmaker in game_data.get("bookmakers", []):
-        for market in bookmaker.get("markets", []):
-            if market["key"] == "h2h":
-                outcomes = {o["name"]: o["price"] for o in market["outcomes"]}
-                bookmaker_odds.append({
-                    "bookmaker": bookmaker["title"],
-                    "home_odds": outcomes.get(game_data["home_team"], 0),
-                    "away_odds": outcomes.get(game_data["away_team"], 0)
-                })
-            elif market["key"] == "spreads":
-                spread = market["outcomes"][0].get("point", 0)
-            elif market["key"] == "totals":
-                total = market["outcomes"][0].get("point", 0)
+    # Get ML prediction if available (the dashboard passes in its batched predictions)
+    if ml_prediction is None:
+        ml_prediction = get_ml_prediction(game_data, sport)
+    
+    # Extract odds - h2h prices as parallel arrays, a missing team price stays NaN
+    market = rows["market"]
+    h2h = market == "h2h"
+    book_titles = rows["book_title"][h2h]
+    odds = np.stack((rows["home_price"][h2h], rows["away_price"][h2h]), axis=-1)[np.newaxis]
+    home_odds, away_odds = odds[0, :, 0], odds[0, :, 1]
+    
+    i = _last_row(market == "spreads")
+    spread = float(rows["point"][i]) if i is not None else 0
+    i = _last_row(market == "totals")
+    total = float(rows["point"][i]) if i is not None else 0
     
     # Calculate confidence combining odds analysis and ML
-    if bookmaker_odds:
-        avg_home = sum(b["home_odds"] for b in bookmaker_odds) / len(bookmaker_odds)
-        avg_away = sum(b["away_odds"] for b in bookmaker_odds) / len(bookmaker_odds)
+    if len(book_titles):
+        confidence, home_favorite, edge, arb_margin = _score_odds(odds)
         
         # Odds-based confidence
-        home_prob = 1 / avg_home if avg_home > 0 else 0.5
-        away_prob = 1 / avg_away if avg_away > 0 else 0.5
-        
-        if home_prob > away_prob:
-            odds_confidence = min(85, 50 + (home_prob - 0.5) * 70)
-            favorite = "home"
-        else:
-            odds_confidence = min(85, 50 + (away_prob - 0.5) * 70)
-            favorite = "away"
+        odds_confidence = float(confidence[0])
+        favorite = "home" if home_favorite[0] else "away"
         
         # Combine with ML if available
         if ml_prediction:
@@ -314,19 +606,12 @@ def analyze_game_with_ml(game_data: Dict, sport: str = "NFL") -> Dict:
         
         analysis["confidence_score"] = round(final_confidence, 1)
         analysis["favorite"] = favorite
-        analysis["edge"] = abs(home_prob - away_prob) * 100
+        analysis["edge"] = float(edge[0])
         
         # Confidence level
-        if final_confidence >= 80:
-            analysis["confidence_level"] = "ELITE"
-        elif final_confidence >= 70:
-            analysis["confidence_level"] = "HIGH"
-        elif final_confidence >= 60:
-            analysis["confidence_level"] = "GOOD"
-        elif final_confidence >= 50:
-            analysis["confidence_level"] = "FAIR"
-        else:
-            analysis["confidence_level"] = "AVOID"
+        tier = int(confidence_tiers(final_confidence))
+        analysis["confidence_tier"] = tier
+        analysis["confidence_level"] = CONFIDENCE_LEVELS[tier]
         
         # Add ML predictions to analysis
         if ml_prediction:
@@ -352,34 +637,60 @@ def analyze_game_with_ml(game_data: Dict, sport: str = "NFL") -> Dict:
                 analysis["total_prediction"] = "pass"
                 analysis["total_confidence"] = 45
     
-    # Check for arbitrage
-    if len(bookmaker_odds) >= 2:
-        best_home = max(bookmaker_odds, key=lambda x: x.get("home_odds", 0))
-        best_away = max(bookmaker_odds, key=lambda x: x.get("away_odds", 0))
-        
-        if best_home["home_odds"] and best_away["away_odds"]:
-            implied_total = (1/best_home["home_odds"]) + (1/best_away["away_odds"])
-            if implied_total < 1.0:
-                profit = (1 - implied_total) * 100
-                analysis["arbitrage"] = {
-                    "exists": True,
-                    "profit_margin": profit,
-                    "bet_home": {"bookmaker": best_home["bookmaker"], "odds": best_home["home_odds"]},
-                    "bet_away": {"bookmaker": best_away["bookmaker"], "odds": best_away["away_odds"]}
-                }
+        # Check for arbitrage
+        if arb_margin[0] > 0:
+            best_home = int(np.nanargmax(home_odds))
+            best_away = int(np.nanargmax(away_odds))
+            analysis["arbitrage"] = {
+                "exists": True,
+                "profit_margin": float(arb_margin[0]),
+                "bet_home": {"bookmaker": str(book_titles[best_home]), "odds": float(home_odds[best_home])},
+                "bet_away": {"bookmaker": str(book_titles[best_away]), "odds": float(away_odds[best_away])}
+            }
+    
+    # First-book prices for generate_recommendation
+    analysis["odds"] = first_book_odds(rows)
     
     return analysis
 
-def get_cached_odds(sport: str = "americanfootball_nfl") -> List[Dict]:
-    """Get odds from SERVER cache - NO API calls made by users"""
+async def fetch_odds(sport: str) -> List[Dict]:
+    """Fetch odds for one sport into the server cache (single-flight)"""
+    
+    # Join a fetch that is already running instead of issuing another
+    if sport in _inflight_fetches:
+        return await _inflight_fetches[sport]
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight_fetches[sport] = future
+    data = SERVER_ODDS_CACHE.get(sport, {}).get("data", [])
+    
+    try:
+        async with http_session.get(
+            f"{ODDS_API_BASE}/sports/{SPORT_API_KEYS[sport]}/odds",
+            params={'apiKey': ODDS_API_KEY, 'regions': 'us', 'markets': 'h2h,spreads,totals'}
+        ) as response:
+            if response.status == 200:
+                data = orjson.loads(await response.read())
+                SERVER_ODDS_CACHE[sport] = {
+                    "data": data,
+                    "last_updated": datetime.now()
+                }
+                print(f"[SERVER] ✅ Updated {sport}: {len(data)} games")
+            else:
+                print(f"[SERVER] API error {response.status} for {sport}")
+    except Exception as e:
+        print(f"[SERVER] Error updating {sport}: {e}")
+    finally:
+        future.set_result(data)
+        del _inflight_fetches[sport]
+    
+    return data
+
+async def get_cached_odds(sport: str = "americanfootball_nfl") -> List[Dict]:
+    """Get odds from SERVER cache - users only wait on the server's own fetch"""
     
     # Map API sport names to our cache keys
-    sport_map = {
-        "americanfootball_nfl": "nfl",
-        "basketball_nba": "nba",
-        "baseball_mlb": "mlb",
-        "americanfootball_ncaaf": "ncaaf"
-    }
+    sport_map = {api_key: key for key, api_key in SPORT_API_KEYS.items()}
     
     cache_key = sport_map.get(sport, "nfl")
     cache = SERVER_ODDS_CACHE.get(cache_key, {})
@@ -390,6 +701,9 @@ def get_cached_odds(sport: str = "americanfootball_nfl") -> List[Dict]:
     if data:
         age = (datetime.now() - cache["last_updated"]).total_seconds() / 60 if cache.get("last_updated") else 999
         print(f"[USER] Serving {len(data)} cached {cache_key} games (age: {age:.1f} min)")
+    elif cache_key in _inflight_fetches:
+        print(f"[USER] No cached {cache_key} data yet - waiting on server fetch...")
+        data = await _inflight_fetches[cache_key]
     else:
         print(f"[USER] No cached {cache_key} data yet - server is fetching...")
         # Return empty list while waiting for server to fetch
@@ -397,90 +711,99 @@ def get_cached_odds(sport: str = "americanfootball_nfl") -> List[Dict]:
     
     return data
 
-def generate_mock_odds(sport: str) -> List[Dict]:
+# Mock slates: (home, away) matchups per sport
+_NFL_TEAMS = (
+    ("Kansas City Chiefs", "Buffalo Bills"),
+    ("Dallas Cowboys", "Philadelphia Eagles"),
+    ("San Francisco 49ers", "Los Angeles Rams"),
+    ("Baltimore Ravens", "Cincinnati Bengals"),
+    ("Green Bay Packers", "Chicago Bears"),
+    ("New England Patriots", "New York Jets"),
+    ("Pittsburgh Steelers", "Cleveland Browns"),
+    ("Miami Dolphins", "Jacksonville Jaguars"),
+    ("Tennessee Titans", "Houston Texans"),
+    ("Seattle Seahawks", "Arizona Cardinals"),
+    ("Las Vegas Raiders", "Denver Broncos"),
+    ("Tampa Bay Buccaneers", "New Orleans Saints"),
+    ("Minnesota Vikings", "Detroit Lions"),
+    ("Indianapolis Colts", "Los Angeles Chargers"),
+    ("Atlanta Falcons", "Carolina Panthers")
+)
+_NBA_TEAMS = (
+    ("Los Angeles Lakers", "Boston Celtics"),
+    ("Golden State Warriors", "Phoenix Suns"),
+    ("Milwaukee Bucks", "Miami Heat"),
+    ("Denver Nuggets", "Dallas Mavericks"),
+    ("Philadelphia 76ers", "Brooklyn Nets"),
+    ("Memphis Grizzlies", "Sacramento Kings"),
+    ("Cleveland Cavaliers", "New York Knicks"),
+    ("Portland Trail Blazers", "Utah Jazz"),
+    ("Atlanta Hawks", "Orlando Magic"),
+    ("Toronto Raptors", "Chicago Bulls"),
+    ("San Antonio Spurs", "Houston Rockets"),
+    ("Indiana Pacers", "Detroit Pistons")
+)
+_MLB_TEAMS = (
+    ("New York Yankees", "Boston Red Sox"),
+    ("Los Angeles Dodgers", "San Francisco Giants"),
+    ("Houston Astros", "Texas Rangers"),
+    ("Atlanta Braves", "New York Mets"),
+    ("Philadelphia Phillies", "Washington Nationals"),
+    ("Chicago Cubs", "St. Louis Cardinals"),
+    ("San Diego Padres", "Arizona Diamondbacks"),
+    ("Tampa Bay Rays", "Baltimore Orioles"),
+    ("Cleveland Guardians", "Minnesota Twins"),
+    ("Toronto Blue Jays", "Seattle Mariners"),
+    ("Milwaukee Brewers", "Cincinnati Reds")
+)
+_NCAAF_TEAMS = (
+    ("Alabama", "Georgia"),
+    ("Ohio State", "Michigan"),
+    ("Texas", "Oklahoma"),
+    ("USC", "Notre Dame"),
+    ("Florida State", "Miami"),
+    ("Penn State", "Michigan State"),
+    ("Oregon", "Washington"),
+    ("LSU", "Auburn"),
+    ("Tennessee", "Florida"),
+    ("Clemson", "South Carolina"),
+    ("Wisconsin", "Iowa"),
+    ("UCLA", "Stanford")
+)
+_TEAMS_BY_SPORT = {"nfl": _NFL_TEAMS, "nba": _NBA_TEAMS, "mlb": _MLB_TEAMS, "ncaaf": _NCAAF_TEAMS}
+
+# Seed the ML team encoder with the known NFL teams
+for _matchup in _NFL_TEAMS:
+    for _name in _matchup:
+        team_id(_name)
+
+def generate_mock_odds(sport: str, seed: Optional[int] = None) -> List[Dict]:
     """Generate realistic mock odds"""
-    import random
-    
-    if "nfl" in sport:
-        teams = [
-            ("Kansas City Chiefs", "Buffalo Bills"),
-            ("Dallas Cowboys", "Philadelphia Eagles"),
-            ("San Francisco 49ers", "Los Angeles Rams"),
-            ("Baltimore Ravens", "Cincinnati Bengals"),
-            ("Green Bay Packers", "Chicago Bears"),
-            ("New England Patriots", "New York Jets"),
-            ("Pittsburgh Steelers", "Cleveland Browns"),
-            ("Miami Dolphins", "Jacksonville Jaguars"),
-            ("Tennessee Titans", "Houston Texans"),
-            ("Seattle Seahawks", "Arizona Cardinals"),
-            ("Las Vegas Raiders", "Denver Broncos"),
-            ("Tampa Bay Buccaneers", "New Orleans Saints"),
-            ("Minnesota Vikings", "Detroit Lions"),
-            ("Indianapolis Colts", "Los Angeles Chargers"),
-            ("Atlanta Falcons", "Carolina Panthers")
-        ]
-    elif "nba" in sport:
-        teams = [
-            ("Los Angeles Lakers", "Boston Celtics"),
-            ("Golden State Warriors", "Phoenix Suns"),
-            ("Milwaukee Bucks", "Miami Heat"),
-            ("Denver Nuggets", "Dallas Mavericks"),
-            ("Philadelphia 76ers", "Brooklyn Nets"),
-            ("Memphis Grizzlies", "Sacramento Kings"),
-            ("Cleveland Cavaliers", "New York Knicks"),
-            ("Portland Trail Blazers", "Utah Jazz"),
-            ("Atlanta Hawks", "Orlando Magic"),
-            ("Toronto Raptors", "Chicago Bulls"),
-            ("San Antonio Spurs", "Houston Rockets"),
-            ("Indiana Pacers", "Detroit Pistons")
-        ]
+    teams = next((teams for key, teams in _TEAMS_BY_SPORT.items() if key in sport), _NCAAF_TEAMS)
+    
+    if "nba" in sport:
+        total_range = (210, 240)
     elif "mlb" in sport:
-        teams = [
-            ("New York Yankees", "Boston Red Sox"),
-            ("Los Angeles Dodgers", "San Francisco Giants"),
-            ("Houston Astros", "Texas Rangers"),
-            ("Atlanta Braves", "New York Mets"),
-            ("Philadelphia Phillies", "Washington Nationals"),
-            ("Chicago Cubs", "St. Louis Cardinals"),
-            ("San Diego Padres", "Arizona Diamondbacks"),
-            ("Tampa Bay Rays", "Baltimore Orioles"),
-            ("Cleveland Guardians", "Minnesota Twins"),
-            ("Toronto Blue Jays", "Seattle Mariners"),
-            ("Milwaukee Brewers", "Cincinnati Reds")
-        ]
-    else:  # NCAAF
-        teams = [
-            ("Alabama", "Georgia"),
-            ("Ohio State", "Michigan"),
-            ("Texas", "Oklahoma"),
-            ("USC", "Notre Dame"),
-            ("Florida State", "Miami"),
-            ("Penn State", "Michigan State"),
-            ("Oregon", "Washington"),
-            ("LSU", "Auburn"),
-            ("Tennessee", "Florida"),
-            ("Clemson", "South Carolina"),
-            ("Wisconsin", "Iowa"),
-            ("UCLA", "Stanford")
-        ]
+        total_range = (7, 11)
+    else:
+        total_range = (38, 58)
+    
+    # Draw every game's numbers in one batch per column
+    rng = np.random.default_rng(seed)
+    n = len(teams)
+    home_mls = rng.uniform(1.5, 3.0, size=n).round(2).tolist()
+    away_mls = rng.uniform(1.5, 3.0, size=n).round(2).tolist()
+    spreads = rng.uniform(-14, 14, size=n).round(1).tolist()
+    totals = rng.uniform(*total_range, size=n).round(1).tolist()
+    hours_ahead = rng.integers(1, 73, size=n).tolist()
+    now = datetime.now()
     
     games = []
-    for home, away in teams:
-        home_ml = round(random.uniform(1.5, 3.0), 2)
-        away_ml = round(random.uniform(1.5, 3.0), 2)
-        spread = round(random.uniform(-14, 14), 1)
-        
-        if "nba" in sport:
-            total = round(random.uniform(210, 240), 1)
-        elif "mlb" in sport:
-            total = round(random.uniform(7, 11), 1)
-        else:
-            total = round(random.uniform(38, 58), 1)
-        
+    for (home, away), home_ml, away_ml, spread, total, hours in zip(teams, home_mls, away_mls, spreads, totals, hours_ahead):
         games.append({
             "id": f"game_{len(games)+1}_{sport}",
             "sport_key": sport,
-            "commence_time": (datetime.now() + timedelta(hours=random.randint(1, 72))).isoformat(),
+            "commence_time": (now + timedelta(hours=hours)).isoformat(),
             "home_team": home,
             "away_team": away,
             "bookmakers": [
@@ -529,7 +852,27 @@ def generate_mock_odds(sport: str) -> List[Dict]:
     
     return games
 
-def get_dashboard_html(user: str, sport: str = "NFL") -> str:
+def payload_digest(data: bytes) -> bytes:
+    """16-byte digest of a payload, used as a cache key"""
+    if _BLAKE3_AVAILABLE:
+        return blake3(data).digest(length=16)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+def split_user_slots(html: str) -> Tuple[List[bytes], List[str]]:
+    """Encode a rendered page once into the bytes chunks around its per-user slots"""
+    parts = _USER_SLOT_RE.split(html)
+    return [part.encode() for part in parts[::2]], parts[1::2]
+
+@lru_cache(maxsize=1024)
+def user_slot_values(user: str, roi: float, wins: int, losses: int) -> Dict[str, bytes]:
+    """Encoded per-user dashboard slots (the stats key the cache, so new results miss it)"""
+    return {
+        USER_PLACEHOLDER: str(escape(user)).encode(),
+        USER_ROI_PLACEHOLDER: f"{roi:.1f}".encode(),
+        USER_RECORD_PLACEHOLDER: f"{wins}-{losses}".encode()
+    }
+
+async def get_dashboard_html(user: str, sport: str = "NFL") -> bytes:
     """Generate enhanced dashboard with clear betting recommendations"""
     
     # Map sports
@@ -540,18 +883,56 @@ def get_dashboard_html(user: str, sport: str = "NFL") -> str:
         "MLB": "baseball_mlb"
     }
     
-    sport_key = sport_map.get(sport, "americanfootball_nfl")
-    games = get_cached_odds(sport_key)
+    page = dashboard_pages.get(sport)
+    if page is None:
+        sport_key = sport_map.get(sport, "americanfootball_nfl")
+        async with _render_locks[sport_key]:
+            page = dashboard_pages.get(sport)
+            if page is None:
+                games = await get_cached_odds(sport_key)
+                
+                # Reuse the rendered page while the odds payload is unchanged
+                cache_key = (sport, payload_digest(orjson.dumps(games, option=orjson.OPT_SORT_KEYS)), ML_MODELS_AVAILABLE)
+                page = html_cache.get(cache_key)
+                if page is None:
+                    page = split_user_slots(render_dashboard_html(sport, games))
+                    html_cache[cache_key] = page
+                dashboard_pages[sport] = page
+    
+    # Performance stats
+    user_perf = user_performance.get(user, {
+        "total_bets": 0,
+        "wins": 0,
+        "losses": 0,
+        "profit": 0,
+        "roi": 0
+    })
+    
+    # Only the small per-user values are filled in per request; the page
+    # chunks around them were encoded once when it was cached
+    values = user_slot_values(user, user_perf.get('roi', 0), user_perf.get('wins', 0), user_perf.get('losses', 0))
+    chunks, slots = page
+    body = [chunks[0]]
+    for slot, chunk in zip(slots, chunks[1:]):
+        body += (values[slot], chunk)
+    return b"".join(body)
+
+def render_dashboard_html(sport: str, games: List[Dict]) -> str:
+    """Render the dashboard for a sport's games, leaving per-user slots as placeholders"""
     
     # Analyze games and generate recommendations
     all_recommendations = []
     elite_bets = []
     arbitrage_opportunities = []
     
-    # Analyze all available games (no limit needed with real data)
-    for game in games:
-        analysis = analyze_game_with_ml(game, sport)
-        recommendation = BettingRecommendation.generate_recommendation(game, analysis)
+    # Parse every game's odds once, then analyze each game's rows
+    # (no limit needed with real data)
+    columns = parse_odds_to_columns(games)
+    ml_predictions = get_ml_predictions(games, sport)
+    for game_idx, (game, ml_prediction) in enumerate(zip(games, ml_predictions)):
+        rows = odds_rows(columns, game_idx)
+        analysis = analyze_game_with_ml(game, sport, rows, ml_prediction)
+        recommendation = BettingRecommendation.generate_recommendation(game, analysis, expected_values=False)
         
         if recommendation["bets"]:
             all_recommendations.append({
@@ -573,658 +954,166 @@ def get_dashboard_html(user: str, sport: str = "NFL") -> str:
                         "bet": bet
                     })
     
-    # Generate bet cards HTML
-    bet_cards_html = ""
-    for rec in all_recommendations:
-        game = rec["game"]
-        analysis = rec["analysis"]
-        recommendation = rec["recommendation"]
-        
-        # Confidence color
-        confidence_color = {
-            "ELITE": "#4CAF50",
-            "HIGH": "#66BB6A",
-            "GOOD": "#FFC107",
-            "FAIR": "#FF9800",
-            "AVOID": "#F44336"
-        }.get(analysis.get("confidence_level", "FAIR"), "#9E9E9E")
-        
-        # Generate bet recommendations HTML
-        bets_html = ""
-        for bet in recommendation["bets"][:4]:  # Show top 4 bets
-            bet_color = "#4CAF50" if bet["confidence"] >= 70 else "#2196F3"
-            bets_html += f"""
-            <div style="background: {bet_color}; color: white; padding: 12px; 
-                        border-radius: 8px; margin: 10px 0;">
-                <div style="display: flex; justify-content: space-between; align-items: center;">
-                    <div>
-                        <strong style="font-size: 16px;">{bet['type']}: {bet['pick']}</strong>
-                        <div style="font-size: 14px; margin-top: 5px;">
-                            Odds: {bet.get('odds', 'N/A')} | Units: {bet['suggested_unit']}
-                        </div>
-                        <div style="font-size: 12px; margin-top: 5px; opacity: 0.9;">
-                            {bet['reason']}
-                        </div>
-                    </div>
-                    <div style="text-align: right;">
-                        <div style="font-size: 24px; font-weight: bold;">
-                            {bet['confidence']:.0f}%
-                        </div>
-                        <div style="font-size: 12px;">
-                            EV: {bet.get('expected_value', 'N/A')}
-                        </div>
-                    </div>
-                </div>
-            </div>
-            """
-        
-        # ML indicator
-        ml_badge = ""
-        if analysis.get("ml_confidence"):
-            ml_badge = f"""
-            <span style="background: #9C27B0; color: white; padding: 2px 8px; 
-                        border-radius: 4px; font-size: 12px; margin-left: 10px;">
-                ML: {analysis['ml_confidence']:.0f}%
-            </span>
-            """
-        
-        bet_cards_html += f"""
-        <div class="bet-card">
-            <div class="bet-card-header">
-                <h3>{game['home_team']} vs {game['away_team']}</h3>
-                <div style="display: flex; align-items: center; gap: 10px; margin-top: 8px;">
-                    <span style="background: #2196F3; color: white; padding: 4px 10px; 
-                                border-radius: 6px; font-size: 13px; font-weight: 500;">
-                        📅 {format_game_time(game.get('commence_time', ''))}
-                    </span>
-                    {ml_badge}
-                </div>
-            </div>
-            <div class="confidence-bar">
-                <div class="confidence-fill" style="width: {analysis.get('confidence_score', 50)}%; 
-                     background: {confidence_color};">
-                    {analysis.get('confidence_score', 50):.1f}%
-                </div>
-            </div>
-            <div style="margin: 15px 0; padding: 10px; background: #f5f5f5; border-radius: 8px;">
-                <strong>Analysis:</strong> {analysis.get('confidence_level', 'UNKNOWN')} confidence
-                {' | ML Model: Active' if ML_MODELS_AVAILABLE else ' | ML Model: Offline'}
-            </div>
-            {bets_html}
-            <div style="display: flex; gap: 10px; margin-top: 15px;">
-                <button onclick="placeBet('{game['id']}', '{recommendation['bets'][0]['pick'] if recommendation['bets'] else ''}')" 
-                        class="action-btn primary">Place Bet</button>
-                <button onclick="trackBet('{game['id']}')" 
-                        class="action-btn secondary">Track</button>
-                <button onclick="showDetails('{game['id']}')" 
-                        class="action-btn">Details</button>
-            </div>
-        </div>
-        """
-    
-    # Generate alerts
-    alerts_html = ""
-    if arbitrage_opportunities:
-        alerts_html += f"""
-        <div class="alert arbitrage">
-            <strong>💰 {len(arbitrage_opportunities)} ARBITRAGE OPPORTUNITIES!</strong><br>
-            Guaranteed profit available - act fast!
-            <ul style="margin: 10px 0 0 20px;">
-        """
-        for arb in arbitrage_opportunities[:3]:
-            alerts_html += f"<li>{arb['game']}: {arb['bet']['odds']}</li>"
-        alerts_html += "</ul></div>"
-    
-    if elite_bets:
-        alerts_html += f"""
-        <div class="alert elite">
-            <strong>🔥 {len(elite_bets)} ELITE BETS (75%+ Confidence)</strong><br>
-            High-confidence opportunities identified by our models.
-        </div>
-        """
-    
-    # Performance stats
-    user_perf = user_performance.get(user, {
-        "total_bets": 0,
-        "wins": 0,
-        "losses": 0,
-        "profit": 0,
-        "roi": 0
-    })
+    # Expected value for every recommended bet on the slate at once
+    BettingRecommendation.add_expected_values(
+        [bet for rec in all_recommendations for bet in rec["recommendation"]["bets"]]
+    )
     
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Sports Betting Analysis - ML Enhanced</title>
-        <meta name="viewport" content="width=device-width, initial-scale=1">
-        {get_google_analytics_script()}
-        <style>
-            * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-            body {{ 
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-                background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
-                min-height: 100vh;
-                padding: 20px;
-            }}
-            .container {{
-                max-width: 1400px;
-                margin: 0 auto;
-            }}
-            .header {{
-                background: rgba(255,255,255,0.98);
-                padding: 30px;
-                border-radius: 15px;
-                margin-bottom: 25px;
-                box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-            }}
-            .ml-status {{
-                display: inline-block;
-                padding: 6px 12px;
-                border-radius: 6px;
-                margin-left: 15px;
-                font-size: 13px;
-                font-weight: 600;
-            }}
-            .ml-active {{ background: #4CAF50; color: white; }}
-            .ml-offline {{ background: #FF9800; color: white; }}
-            .nav-tabs {{
-                display: flex;
-                gap: 10px;
-                margin: 20px 0;
-                flex-wrap: wrap;
-            }}
-            .nav-tab {{
-                padding: 12px 24px;
-                background: rgba(255,255,255,0.9);
-                border: none;
-                border-radius: 8px;
-                cursor: pointer;
-                font-weight: 600;
-                transition: all 0.3s;
-            }}
-            .nav-tab.active {{
-                background: #4CAF50;
-                color: white;
-                transform: translateY(-2px);
-            }}
-            .dashboard {{
-                background: rgba(255,255,255,0.98);
-                padding: 30px;
-                border-radius: 15px;
-                box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-            }}
-            .alert {{
-                padding: 15px 20px;
-                border-radius: 10px;
-                margin-bottom: 15px;
-                font-weight: 500;
-                animation: slideIn 0.5s ease;
-            }}
-            .alert.arbitrage {{
-                background: linear-gradient(135deg, #FFD700, #FFA000);
-                color: #000;
-                border: 2px solid #FF8F00;
-            }}
-            .alert.elite {{
-                background: linear-gradient(135deg, #4CAF50, #45a049);
-                color: white;
-            }}
-            @keyframes slideIn {{
-                from {{ transform: translateX(-100%); opacity: 0; }}
-                to {{ transform: translateX(0); opacity: 1; }}
-            }}
-            .stats-grid {{
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 15px;
-                margin: 25px 0;
-            }}
-            .stat-card {{
-                background: white;
-                padding: 20px;
-                border-radius: 10px;
-                text-align: center;
-                border: 1px solid #e0e0e0;
-                transition: transform 0.3s;
-            }}
-            .stat-card:hover {{
-                transform: translateY(-3px);
-                box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-            }}
-            .stat-value {{
-                font-size: 32px;
-                font-weight: bold;
-                color: #2196F3;
-                margin-bottom: 5px;
-            }}
-            .stat-label {{
-                font-size: 13px;
-                color: #666;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-            }}
-            .bet-card {{
-                background: white;
-                padding: 25px;
-                border-radius: 12px;
-                margin-bottom: 20px;
-                border: 2px solid #e0e0e0;
-                transition: all 0.3s;
-            }}
-            .bet-card:hover {{
-                border-color: #4CAF50;
-                box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-            }}
-            .bet-card-header {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 15px;
-            }}
-            .confidence-bar {{
-                height: 35px;
-                background: #f0f0f0;
-                border-radius: 20px;
-                overflow: hidden;
-                margin: 15px 0;
-            }}
-            .confidence-fill {{
-                height: 100%;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                color: white;
-                font-weight: bold;
-                font-size: 16px;
-                transition: width 0.5s;
-            }}
-            .action-btn {{
-                padding: 10px 20px;
-                border: none;
-                border-radius: 8px;
-                cursor: pointer;
-                font-weight: 600;
-                transition: all 0.3s;
-                font-size: 14px;
-            }}
-            .action-btn.primary {{
-                background: #4CAF50;
-                color: white;
-            }}
-            .action-btn.primary:hover {{
-                background: #45a049;
-                transform: translateY(-2px);
-            }}
-            .action-btn.secondary {{
-                background: #2196F3;
-                color: white;
-            }}
-            .action-btn.secondary:hover {{
-                background: #1976D2;
-            }}
-            .action-btn {{
-                background: #f5f5f5;
-                color: #333;
-            }}
-            .action-btn:hover {{
-                background: #e0e0e0;
-            }}
-            .refresh-btn {{
-                position: fixed;
-                bottom: 30px;
-                right: 30px;
-                width: 60px;
-                height: 60px;
-                border-radius: 50%;
-                background: #4CAF50;
-                color: white;
-                border: none;
-                font-size: 24px;
-                cursor: pointer;
-                box-shadow: 0 4px 15px rgba(0,0,0,0.3);
-                transition: all 0.3s;
-            }}
-            .refresh-btn:hover {{
-                transform: rotate(180deg);
-                background: #45a049;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🎯 Smart Betting Analysis Platform
-                    <span class="ml-status {'ml-active' if ML_MODELS_AVAILABLE else 'ml-offline'}">
-                        {'ML Models: Active' if ML_MODELS_AVAILABLE else 'ML Models: Simplified'}
-                    </span>
-                </h1>
-                <p style="margin-top: 10px; color: #666;">
-                    Welcome {user} | Real-time analysis with {'ML-powered' if ML_MODELS_AVAILABLE else 'statistical'} predictions
-                </p>
-            </div>
-
-            <div class="nav-tabs">
-                <button class="nav-tab {'active' if sport == 'NFL' else ''}" 
-                        onclick="window.location.href='/dashboard?sport=NFL'">🏈 NFL</button>
-                <button class="nav-tab {'active' if sport == 'NCAAF' else ''}" 
-                        onclick="window.location.href='/dashboard?sport=NCAAF'">🎓 NCAAF</button>
-                <button class="nav-tab {'active' if sport == 'NBA' else ''}" 
-                        onclick="window.location.href='/dashboard?sport=NBA'">🏀 NBA</button>
-                <button class="nav-tab {'active' if sport == 'MLB' else ''}" 
-                        onclick="window.location.href='/dashboard?sport=MLB'">⚾ MLB</button>
-            </div>
-
-            <div class="dashboard">
-                {alerts_html}
-                
-                <div class="stats-grid">
-                    <div class="stat-card">
-                        <div class="stat-value">{len(all_recommendations)}</div>
-                        <div class="stat-label">Active Games</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">{len(elite_bets)}</div>
-                        <div class="stat-label">Elite Bets</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">{len(arbitrage_opportunities)}</div>
-                        <div class="stat-label">Arbitrage Opps</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">{'LIVE' if ODDS_API_KEY != 'demo-key' else 'DEMO'}</div>
-                        <div class="stat-label">Data Status</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">{user_perf.get('roi', 0):.1f}%</div>
-                        <div class="stat-label">Your ROI</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-value">{user_perf.get('wins', 0)}-{user_perf.get('losses', 0)}</div>
-                        <div class="stat-label">Win-Loss</div>
-                    </div>
-                </div>
-                
-                <h2 style="margin: 30px 0 20px;">🎯 Today's Best Betting Opportunities</h2>
-                <div class="bets-container">
-                    {bet_cards_html}
-                </div>
-            </div>
-        </div>
-        
-        <button class="refresh-btn" onclick="location.reload()">↻</button>
-
-        <script>
-            function placeBet(gameId, pick) {{
-                gtag('event', 'place_bet', {{
-                    'event_category': 'betting',
-                    'event_label': pick,
-                    'game_id': gameId
-                }});
-                
-                fetch('/api/place-bet', {{
-                    method: 'POST',
-                    headers: {{'Content-Type': 'application/json'}},
-                    body: JSON.stringify({{
-                        gameId: gameId,
-                        pick: pick,
-                        timestamp: new Date().toISOString()
-                    }})
-                }}).then(response => response.json())
-                .then(data => {{
-                    alert('Bet placed: ' + pick);
-                }});
-            }}
-            
-            function trackBet(gameId) {{
-                gtag('event', 'track_bet', {{
-                    'event_category': 'tracking',
-                    'game_id': gameId
-                }});
-                alert('Added to tracking list');
-            }}
-            
-            function showDetails(gameId) {{
-                gtag('event', 'view_details', {{
-                    'event_category': 'engagement',
-                    'game_id': gameId
-                }});
-                window.location.href = '/api/analysis/' + gameId;
-            }}
-            
-            // Auto-refresh every 5 minutes
-            setTimeout(() => {{
-                location.reload();
-            }}, 300000);
-        </script>
-    </body>
-    </html>
-    """
+    return _DASHBOARD_TPL.render(
+        sport=sport,
+        recommendations=all_recommendations,
+        elite_bets=elite_bets,
+        arbitrage_opportunities=arbitrage_opportunities,
+        user=USER_PLACEHOLDER,
+        user_roi=USER_ROI_PLACEHOLDER,
+        user_record=USER_RECORD_PLACEHOLDER
+    )
 
-def get_google_analytics_script():
-    """Google Analytics tracking script"""
-    return f"""
+# Google Analytics tracking script - depends only on GOOGLE_ANALYTICS_ID, so build it once
+GA_SCRIPT = Template("""
     <!-- Google Analytics -->
-    <script async src="https://www.googletagmanager.com/gtag/js?id={GOOGLE_ANALYTICS_ID}"></script>
+    <script async src="https://www.googletagmanager.com/gtag/js?id=$ga_id"></script>
     <script>
       window.dataLayer = window.dataLayer || [];
-      function gtag(){{dataLayer.push(arguments);}}
+      function gtag(){dataLayer.push(arguments);}
       gtag('js', new Date());
-      gtag('config', '{GOOGLE_ANALYTICS_ID}');
+      gtag('config', '$ga_id');
     </script>
-    """
+    """).substitute(ga_id=GOOGLE_ANALYTICS_ID)
+
+# Static CSS/JS, served with long-lived caching under content-versioned URLs
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers cache every file for a year"""
+    
+    async def get_response(self, path: str, scope) -> Any:
+        response = await super().get_response(path, scope)
+        if response.status_code == 200:
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+app.mount("/static", ImmutableStaticFiles(directory=STATIC_DIR), name="static")
+
+@lru_cache(maxsize=None)
+def static_url(name: str) -> str:
+    """URL for a static file, versioned by its content so a deploy busts caches"""
+    with open(os.path.join(STATIC_DIR, name), "rb") as f:
+        return f"/static/{name}?v={payload_digest(f.read()).hex()[:12]}"
+
+def strip_indentation(html: str) -> str:
+    """Drop indentation and blank lines from markup (none of our pages use <pre>)"""
+    return "\n".join(line.strip() for line in html.splitlines() if line.strip())
+
+class MinifyingLoader(FileSystemLoader):
+    """FileSystemLoader that strips indentation before a template is compiled"""
+    
+    def get_source(self, environment: Environment, template: str) -> Tuple[str, Optional[str], Any]:
+        source, filename, uptodate = super().get_source(environment, template)
+        return strip_indentation(source), filename, uptodate
+
+# Page templates, minified and compiled once - auto_reload is off since they only change on deploy
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+template_env = Environment(
+    loader=MinifyingLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=False,
+    cache_size=-1,
+    trim_blocks=True,
+    lstrip_blocks=True
+)
+template_env.filters["game_time"] = format_game_time
+template_env.globals.update(
+    ga_script=Markup(strip_indentation(GA_SCRIPT)),
+    ml_active=ML_MODELS_AVAILABLE,
+    live_odds=ODDS_API_KEY != 'demo-key',
+    confidence_colors=CONFIDENCE_COLORS,
+    static_url=static_url
+)
+_DASHBOARD_TPL = template_env.get_template("dashboard.html")
+
+# Landing and auth pages only depend on import-time settings, so they are
+# rendered and encoded once and sent as-is with a Content-Length
+HOME_PAGE = template_env.get_template("home.html").render(
+    ml_status="ML Models Active" if ML_MODELS_AVAILABLE else "Statistical Analysis"
+).encode()
+REGISTER_PAGE = template_env.get_template("register.html").render().encode()
+LOGIN_PAGE = template_env.get_template("login.html").render().encode()
+
+password_hasher = PasswordHasher() if _ARGON2_AVAILABLE else None
+
+def hash_password(password: str) -> str:
+    """Salted, deliberately slow password hash (argon2id, scrypt without argon2)"""
+    if _ARGON2_AVAILABLE:
+        return password_hasher.hash(password)
+    salt = secrets.token_bytes(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=2**14, r=8, p=1)
+    return f"scrypt${salt.hex()}${digest.hex()}"
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """Check a password against its stored hash in constant time"""
+    if password_hash.startswith("scrypt$"):
+        _, salt, digest = password_hash.split("$")
+        supplied = hashlib.scrypt(password.encode(), salt=bytes.fromhex(salt), n=2**14, r=8, p=1)
+        return hmac.compare_digest(supplied, bytes.fromhex(digest))
+    if not _ARGON2_AVAILABLE:
+        return False
+    try:
+        return password_hasher.verify(password_hash, password)
+    except (InvalidHashError, VerificationError):
+        return False
+
+def create_session(username: str) -> str:
+    """Start a session for username, dropping expired ones, and return its id"""
+    session_id = secrets.token_urlsafe(16)
+    now = datetime.now().timestamp()
+    db.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+    db.execute("INSERT INTO sessions VALUES (?, ?, ?)", (session_id, username, now + SESSION_TTL))
+    return session_id
+
+# Session cookie attributes, serialized once (token_urlsafe ids need no quoting)
+_SESSION_COOKIE_ATTRS = f"; HttpOnly; Max-Age={SESSION_TTL}; Path=/; SameSite=lax" + ("; Secure" if COOKIE_SECURE else "")
+
+def set_session_cookie(response: Response, session_id: str):
+    """Attach the session cookie, hidden from scripts and expiring with the session"""
+    response.headers.append("set-cookie", f"session_id={session_id}{_SESSION_COOKIE_ATTRS}")
+
+def session_user(request: Request) -> Optional[str]:
+    """Username behind the request's session cookie, if the session is still live"""
+    row = db.execute(
+        "SELECT username FROM sessions WHERE id = ? AND expires_at > ?",
+        (request.cookies.get("session_id"), datetime.now().timestamp())
+    ).fetchone()
+    return row[0] if row else None
 
 # Routes (keeping existing auth routes)
 @app.get("/", response_class=HTMLResponse)
 async def home():
     """Landing page"""
-    ml_status = "ML Models Active" if ML_MODELS_AVAILABLE else "Statistical Analysis"
-    
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Smart Betting Platform - ML Enhanced</title>
-        {get_google_analytics_script()}
-        <style>
-            body {{
-                font-family: -apple-system, sans-serif;
-                background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                height: 100vh;
-                margin: 0;
-            }}
-            .container {{
-                background: white;
-                padding: 50px;
-                border-radius: 20px;
-                box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-                text-align: center;
-                max-width: 500px;
-            }}
-            h1 {{ color: #333; margin-bottom: 20px; }}
-            .features {{
-                text-align: left;
-                margin: 30px 0;
-                padding: 20px;
-                background: #f5f5f5;
-                border-radius: 10px;
-            }}
-            .feature {{
-                margin: 10px 0;
-                padding-left: 25px;
-                position: relative;
-            }}
-            .feature:before {{
-                content: "✓";
-                position: absolute;
-                left: 0;
-                color: #4CAF50;
-                font-weight: bold;
-            }}
-            .btn {{
-                display: inline-block;
-                padding: 15px 40px;
-                margin: 10px;
-                background: linear-gradient(135deg, #4CAF50, #45a049);
-                color: white;
-                text-decoration: none;
-                border-radius: 30px;
-                font-weight: 600;
-                font-size: 16px;
-                transition: all 0.3s;
-                box-shadow: 0 4px 15px rgba(76, 175, 80, 0.3);
-            }}
-            .btn:hover {{
-                transform: translateY(-3px);
-                box-shadow: 0 6px 20px rgba(76, 175, 80, 0.4);
-            }}
-            .btn.secondary {{
-                background: linear-gradient(135deg, #2196F3, #1976D2);
-                box-shadow: 0 4px 15px rgba(33, 150, 243, 0.3);
-            }}
-            .btn.secondary:hover {{
-                box-shadow: 0 6px 20px rgba(33, 150, 243, 0.4);
-            }}
-            .status {{
-                margin-top: 30px;
-                padding: 15px;
-                background: #f0f0f0;
-                border-radius: 10px;
-                font-size: 14px;
-            }}
-            .ml-badge {{
-                display: inline-block;
-                padding: 4px 10px;
-                background: {'#4CAF50' if ML_MODELS_AVAILABLE else '#FF9800'};
-                color: white;
-                border-radius: 5px;
-                font-weight: 600;
-                margin: 5px;
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>🎯 Smart Betting Platform</h1>
-            <p style="color: #666; font-size: 18px;">AI-Powered Sports Betting Analysis</p>
-            
-            <div class="features">
-                <div class="feature">Clear betting recommendations</div>
-                <div class="feature">ML-powered predictions</div>
-                <div class="feature">Real-time arbitrage detection</div>
-                <div class="feature">Multi-sport coverage (NFL, NBA, MLB)</div>
-                <div class="feature">Performance tracking & ROI metrics</div>
-            </div>
-            
-            <a href="/register" class="btn">Start Free Trial</a>
-            <a href="/login" class="btn secondary">Login</a>
-            
-            <div class="status">
-                <div style="margin-bottom: 10px;">System Status:</div>
-                <span class="ml-badge">{ml_status}</span>
-                <span class="ml-badge" style="background: #2196F3;">{'Live Odds' if ODDS_API_KEY != 'demo-key' else 'Demo Mode'}</span>
-                <span class="ml-badge" style="background: #9C27B0;">GA4 Active</span>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return HTMLResponse(HOME_PAGE)
 
 @app.get("/register", response_class=HTMLResponse)
 async def register_page():
     """Registration page"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Register - Smart Betting Platform</title>
-        {get_google_analytics_script()}
-        <style>
-            body {{
-                font-family: -apple-system, sans-serif;
-                background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                height: 100vh;
-                margin: 0;
-            }}
-            .container {{
-                background: white;
-                padding: 40px;
-                border-radius: 20px;
-                box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-                max-width: 400px;
-                width: 100%;
-            }}
-            h2 {{ color: #333; margin-bottom: 30px; text-align: center; }}
-            input {{
-                width: 100%;
-                padding: 12px;
-                margin: 10px 0;
-                border: 1px solid #ddd;
-                border-radius: 8px;
-                font-size: 16px;
-            }}
-            button {{
-                width: 100%;
-                padding: 14px;
-                background: linear-gradient(135deg, #4CAF50, #45a049);
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: 16px;
-                font-weight: 600;
-                cursor: pointer;
-                margin-top: 20px;
-            }}
-            button:hover {{ background: #45a049; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h2>🎯 Create Your Account</h2>
-            <form action="/register" method="post">
-                <input type="text" name="username" placeholder="Username" required>
-                <input type="email" name="email" placeholder="Email" required>
-                <input type="password" name="password" placeholder="Password" required>
-                <input type="text" name="access_code" placeholder="Access Code (BETA2024)" required>
-                <button type="submit">Start Winning</button>
-                <p style="text-align: center; margin-top: 20px; color: #666;">
-                    Already have an account? <a href="/login">Login</a>
-                </p>
-            </form>
-        </div>
-        <script>
-            gtag('event', 'page_view', {{'page_title': 'Register'}});
-        </script>
-    </body>
-    </html>
-    """
+    return HTMLResponse(REGISTER_PAGE)
 
 @app.post("/register")
 async def register(username: str = Form(...), email: str = Form(...), 
                   password: str = Form(...), access_code: str = Form(...)):
     """Handle registration"""
-    valid_codes = ["BETA2024", "EARLY2024", "VIP2024", "ML2024"]
-    
-    if access_code not in valid_codes:
+    if access_code not in VALID_CODES:
         raise HTTPException(status_code=400, detail="Invalid access code")
     
-    if username in users_db:
+    if db.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone():
         raise HTTPException(status_code=400, detail="Username already exists")
     
-    # Store user
-    password_hash = hashlib.sha256(password.encode()).hexdigest()
-    users_db[username] = {
-        "email": email,
-        "password_hash": password_hash,
-        "created_at": datetime.now().isoformat(),
-        "access_code": access_code
-    }
+    # Store user (hashing runs off the event loop)
+    password_hash = await asyncio.to_thread(hash_password, password)
+    try:
+        db.execute("INSERT INTO users VALUES (?, ?, ?, ?, ?)",
+                   (username, email, password_hash, datetime.now().isoformat(), access_code))
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=400, detail="Username already exists")
     
     # Initialize user performance
     user_performance[username] = {
@@ -1236,141 +1125,79 @@ async def register(username: str = Form(...), email: str = Form(...),
     }
     
     # Create session
-    session_id = secrets.token_hex(16)
-    sessions[session_id] = username
+    session_id = create_session(username)
     
     response = RedirectResponse(url="/dashboard", status_code=303)
-    response.set_cookie(key="session_id", value=session_id)
+    set_session_cookie(response, session_id)
     
     return response
 
 @app.get("/login", response_class=HTMLResponse)
 async def login_page():
     """Login page"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Login - Smart Betting Platform</title>
-        {get_google_analytics_script()}
-        <style>
-            body {{
-                font-family: -apple-system, sans-serif;
-                background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                height: 100vh;
-                margin: 0;
-            }}
-            .container {{
-                background: white;
-                padding: 40px;
-                border-radius: 20px;
-                box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-                max-width: 400px;
-                width: 100%;
-            }}
-            h2 {{ color: #333; margin-bottom: 30px; text-align: center; }}
-            input {{
-                width: 100%;
-                padding: 12px;
-                margin: 10px 0;
-                border: 1px solid #ddd;
-                border-radius: 8px;
-                font-size: 16px;
-            }}
-            button {{
-                width: 100%;
-                padding: 14px;
-                background: linear-gradient(135deg, #2196F3, #1976D2);
-                color: white;
-                border: none;
-                border-radius: 8px;
-                font-size: 16px;
-                font-weight: 600;
-                cursor: pointer;
-                margin-top: 20px;
-            }}
-            button:hover {{ background: #1976D2; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h2>🎯 Welcome Back!</h2>
-            <form action="/login" method="post">
-                <input type="text" name="username" placeholder="Username" required>
-                <input type="password" name="password" placeholder="Password" required>
-                <button type="submit">Login</button>
-                <p style="text-align: center; margin-top: 20px; color: #666;">
-                    Don't have an account? <a href="/register">Register</a>
-                </p>
-            </form>
-        </div>
-        <script>
-            gtag('event', 'page_view', {{'page_title': 'Login'}});
-        </script>
-    </body>
-    </html>
-    """
+    return HTMLResponse(LOGIN_PAGE)
 
 @app.post("/login")
 async def login(username: str = Form(...), password: str = Form(...)):
     """Handle login"""
-    if username not in users_db:
+    row = db.execute("SELECT password_hash FROM users WHERE username = ?", (username,)).fetchone()
+    if not row:
         raise HTTPException(status_code=400, detail="Invalid credentials")
     
-    password_hash = hashlib.sha256(password.encode()).hexdigest()
-    if users_db[username]["password_hash"] != password_hash:
+    if not await asyncio.to_thread(verify_password, row[0], password):
         raise HTTPException(status_code=400, detail="Invalid credentials")
     
     # Create session
-    session_id = secrets.token_hex(16)
-    sessions[session_id] = username
+    session_id = create_session(username)
     
     response = RedirectResponse(url="/dashboard", status_code=303)
-    response.set_cookie(key="session_id", value=session_id)
+    set_session_cookie(response, session_id)
     
     return response
 
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(request: Request, sport: str = "NFL"):
     """Main dashboard with ML-powered recommendations"""
-    session_id = request.cookies.get("session_id")
-    if not session_id or session_id not in sessions:
+    username = session_user(request)
+    if not username:
         return RedirectResponse(url="/login", status_code=303)
     
-    username = sessions[session_id]
-    return get_dashboard_html(username, sport)
+    return HTMLResponse(await get_dashboard_html(username, sport))
 
 @app.post("/api/place-bet")
 async def place_bet(request: Request):
     """API endpoint to place bets"""
-    session_id = request.cookies.get("session_id")
-    if not session_id or session_id not in sessions:
+    username = session_user(request)
+    if not username:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    data = await request.json()
-    username = sessions[session_id]
-    
-    # Store bet
-    if username not in user_bets:
-        user_bets[username] = []
+    try:
+        data = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid bet")
     
-    bet = {
-        "game_id": data.get("gameId"),
-        "pick": data.get("pick"),
-        "timestamp": data.get("timestamp", datetime.now().isoformat()),
-        "status": "pending"
-    }
+    # The write happens after we've answered, so anything SQLite can't store
+    # has to be turned away here
+    if not isinstance(data, dict) or not all(
+        isinstance(data.get(field), (str, type(None))) for field in ("gameId", "pick", "timestamp")
+    ):
+        raise HTTPException(status_code=400, detail="Invalid bet")
     
-    user_bets[username].append(bet)
-    bet_history.append({**bet, "user": username})
+    # Queue bet for the next batched write
+    bet_id = uuid.uuid4().hex
+    pending_bets.append((bet_id, username, data.get("gameId"), data.get("pick"),
+                         data.get("timestamp") or datetime.now().isoformat(), "pending"))
     
     # Update user stats
-    user_performance[username]["total_bets"] += 1
+    user_performance.setdefault(username, {
+        "total_bets": 0,
+        "wins": 0,
+        "losses": 0,
+        "profit": 0,
+        "roi": 0
+    })["total_bets"] += 1
     
-    return {"success": True, "message": f"Bet placed: {data.get('pick')}", "bet_id": len(bet_history)}
+    return {"success": True, "message": f"Bet placed: {data.get('pick')}", "bet_id": bet_id}
 
 @app.get("/api/analysis/{game_id}")
 async def get_game_analysis(game_id: str):
@@ -1388,61 +1215,73 @@ async def get_game_analysis(game_id: str):
 @app.get("/api/performance")
 async def get_user_performance(request: Request):
     """Get user's betting performance"""
-    session_id = request.cookies.get("session_id")
-    if not session_id or session_id not in sessions:
+    username = session_user(request)
+    if not username:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    username = sessions[session_id]
     return user_performance.get(username, {})
 
+async def update_cache_loop():
+    """Refresh every sport's odds concurrently, then sleep until the next update"""
+    while True:
+        print(f"\n[SERVER] Auto-updating cache at {datetime.now()}")
+        
+        # Server fetches data (not users!) - all sports in one round-trip window
+        await asyncio.gather(*(fetch_odds(sport) for sport in SPORT_API_KEYS))
+        
+        print(f"[SERVER] Next update in {CACHE_UPDATE_INTERVAL} minutes")
+        await asyncio.sleep(CACHE_UPDATE_INTERVAL * 60)
+
+def flush_pending_bets():
+    """Write every queued bet to SQLite in a single transaction"""
+    if not pending_bets:
+        return
+    batch = pending_bets[:]
+    del pending_bets[:len(batch)]
+    try:
+        db.execute("BEGIN")
+        db.executemany(BET_INSERT, batch)
+        db.execute("COMMIT")
+    except sqlite3.Error as e:
+        if db.in_transaction:
+            db.execute("ROLLBACK")
+        pending_bets[:0] = batch
+        print(f"[SERVER] Error writing {len(batch)} bets: {e}")
+
+async def bet_flush_loop():
+    """Flush queued bets every BET_FLUSH_INTERVAL seconds"""
+    while True:
+        await asyncio.sleep(BET_FLUSH_INTERVAL)
+        flush_pending_bets()
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize server cache on startup"""
+    global http_session, cache_update_task, bet_flush_task
     print("[SERVER] Initializing server-side cache...")
     
-    # Start background thread for automatic updates
-    def update_cache_loop():
-        while True:
-            print(f"\n[SERVER] Auto-updating cache at {datetime.now()}")
-            
-            sport_mapping = {
-                "nfl": "americanfootball_nfl",
-                "nba": "basketball_nba",
-                "mlb": "baseball_mlb",
-                "ncaaf": "americanfootball_ncaaf"
-            }
-            
-            for sport, api_key in sport_mapping.items():
-                try:
-                    # Server fetches data (not users!)
-                    response = requests.get(
-                        f"{ODDS_API_BASE}/sports/{api_key}/odds",
-                        params={'apiKey': ODDS_API_KEY, 'regions': 'us', 'markets': 'h2h,spreads,totals'},
-                        timeout=10
-                    )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        SERVER_ODDS_CACHE[sport] = {
-                            "data": data,
-                            "last_updated": datetime.now()
-                        }
-                        print(f"[SERVER] ✅ Updated {sport}: {len(data)} games")
-                    
-                    time.sleep(2)  # Be nice to API
-                    
-                except Exception as e:
-                    print(f"[SERVER] Error updating {sport}: {e}")
-            
-            print(f"[SERVER] Next update in {CACHE_UPDATE_INTERVAL} minutes")
-            time.sleep(CACHE_UPDATE_INTERVAL * 60)
-    
-    # Start background thread
-    cache_thread = threading.Thread(target=update_cache_loop, daemon=True)
-    cache_thread.start()
+    # One pooled session for the server's lifetime: keep-alive connections
+    # and cached DNS are shared by every sport's fetch
+    http_session = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=CACHE_UPDATE_INTERVAL * 60),
+        timeout=aiohttp.ClientTimeout(total=10)
+    )
+    cache_update_task = asyncio.create_task(update_cache_loop())
+    bet_flush_task = asyncio.create_task(bet_flush_loop())
     
     print("[SERVER] Cache updater started!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks, write any queued bets and close the HTTP session"""
+    if cache_update_task:
+        cache_update_task.cancel()
+    if bet_flush_task:
+        bet_flush_task.cancel()
+    flush_pending_bets()
+    if http_session:
+        await http_session.close()
+
 @app.get("/api/cache-status")
 async def cache_status():
     """Check server cache status"""
@@ -1452,7 +1291,7 @@ async def cache_status():
             "games": len(cache.get("data", [])),
             "last_updated": cache.get("last_updated").isoformat() if cache.get("last_updated") else None
         }
-    return JSONResponse(content=status)
+    return status
 
 if __name__ == "__main__":
     print("=" * 60)
@@ -1467,4 +1306,22 @@ if __name__ == "__main__":
     print("Cache status: http://localhost:8000/api/cache-status")
     print("=" * 60)
     
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # C event loop and HTTP parser when installed
+    try:
+        import uvloop, httptools
+        server_loop, server_http = "uvloop", "httptools"
+    except ImportError:
+        print("⚠️ uvloop/httptools not available - using asyncio + h11")
+        server_loop, server_http = "asyncio", "h11"
+    
+    # The odds cache and user stats live in process memory and every worker
+    # runs its own cache updater, so extra workers are opt-in
+    workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+    uvicorn.run(
+        "beta_platform_backup:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=8000,
+        loop=server_loop,
+        http=server_http,
+        workers=workers
+    )
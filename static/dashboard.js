@@ -0,0 +1,41 @@
+function placeBet(gameId, pick) {
+    gtag('event', 'place_bet', {
+        'event_category': 'betting',
+        'event_label': pick,
+        'game_id': gameId
+    });
+    
+    fetch('/api/place-bet', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({
+            gameId: gameId,
+            pick: pick,
+            timestamp: new Date().toISOString()
+        })
+    }).then(response => response.json())
+    .then(data => {
+        alert('Bet placed: ' + pick);
+    });
+}
+
+function trackBet(gameId) {
+    gtag('event', 'track_bet', {
+        'event_category': 'tracking',
+        'game_id': gameId
+    });
+    alert('Added to tracking list');
+}
+
+function showDetails(gameId) {
+    gtag('event', 'view_details', {
+        'event_category': 'engagement',
+        'game_id': gameId
+    });
+    window.location.href = '/api/analysis/' + gameId;
+}
+
+// Auto-refresh every 5 minutes
+setTimeout(() => {
+    location.reload();
+}, 300000);